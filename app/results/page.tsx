@@ -15,7 +15,11 @@ import {
   Download,
   ArrowLeft,
 } from "lucide-react"
-import { getEvaluation, hasEvaluation } from "@/lib/api"
+import { getEvaluation, getEvaluationStatus } from "@/lib/api"
+
+// The report may still be generating (possibly on another backend worker)
+const REPORT_POLL_INTERVAL_MS = 2000
+const REPORT_POLL_ATTEMPTS = 90
 
 export default function ResultsPage() {
   const router = useRouter()
@@ -37,10 +41,20 @@ export default function ResultsPage() {
         setIsLoading(true)
         setError(null)
         
-        // Check if evaluation exists first
-        const exists = await hasEvaluation(interviewId)
+        // Check if evaluation exists first, waiting while the report is generated
+        let status = await getEvaluationStatus(interviewId)
+        for (
+          let attempt = 0;
+          !status.exists &&
+          ["pending", "running"].includes(status.report_status) &&
+          attempt < REPORT_POLL_ATTEMPTS;
+          attempt++
+        ) {
+          await new Promise((resolve) => setTimeout(resolve, REPORT_POLL_INTERVAL_MS))
+          status = await getEvaluationStatus(interviewId)
+        }
         
-        if (!exists) {
+        if (!status.exists) {
           setError("Interview not completed yet. Please complete all questions first.")
           setIsLoading(false)
           return
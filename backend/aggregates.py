@@ -0,0 +1,83 @@
+"""
+Running interview statistics
+- Each analyzed answer adds to sum/count per skill and per quality dimension
+  and to a score histogram, via $inc on the interview document
+- Reports read the totals instead of iterating every stored answer
+"""
+
+from typing import Any, Dict, List
+
+STATS_FIELD = "stats"
+HISTOGRAM_BUCKET_WIDTH = 10
+
+# Same point values the report has always used for the quality ratings
+QUALITY_POINTS = {
+    "communication": ("communication_quality", {"poor": 30, "adequate": 60, "good": 80, "excellent": 95}, 60),
+    "technical": ("technical_accuracy", {"poor": 30, "adequate": 60, "good": 80, "excellent": 95}, 60),
+    "depth": ("depth_of_knowledge", {"superficial": 40, "adequate": 65, "good": 80, "deep": 95}, 65),
+}
+
+
+def field_key(name: str) -> str:
+    """Skill names become field names: no dots or leading $ in MongoDB paths"""
+    return name.replace(".", "_").lstrip("$") or "General"
+
+
+def histogram_bucket(score: float) -> str:
+    """Lower bound of the score's bucket: 0, 10, ... 90 (100 joins the top bucket)"""
+    bucket = int(min(max(score, 0), 99) // HISTOGRAM_BUCKET_WIDTH) * HISTOGRAM_BUCKET_WIDTH
+    return str(bucket)
+
+
+def answer_increments(skill_name: str, analysis: Dict[str, Any]) -> Dict[str, float]:
+    """Dotted $inc fields for one analyzed answer"""
+    score = analysis.get("overall_score", 0) or 0
+    skill = field_key(skill_name or "General")
+    increments = {
+        f"{STATS_FIELD}.answers": 1,
+        f"{STATS_FIELD}.score_sum": score,
+        f"{STATS_FIELD}.skills.{skill}.sum": score,
+        f"{STATS_FIELD}.skills.{skill}.count": 1,
+        f"{STATS_FIELD}.histogram.{histogram_bucket(score)}": 1,
+    }
+    for dimension, (field, points, default) in QUALITY_POINTS.items():
+        increments[f"{STATS_FIELD}.quality.{dimension}.sum"] = points.get(analysis.get(field), default)
+        increments[f"{STATS_FIELD}.quality.{dimension}.count"] = 1
+    return increments
+
+
+def apply_increments(doc: Dict[str, Any], increments: Dict[str, float]):
+    """In-memory $inc for the development store"""
+    for path, amount in increments.items():
+        *parents, leaf = path.split(".")
+        target = doc
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = target.get(leaf, 0) + amount
+
+
+def stats_from_answers(answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Rebuild the totals for interviews stored before they were kept incrementally"""
+    doc: Dict[str, Any] = {}
+    for a in answers:
+        analysis = {**a.get("analysis", {}), **{k: a[k] for k in (
+            "overall_score", "communication_quality", "technical_accuracy", "depth_of_knowledge") if k in a}}
+        apply_increments(doc, answer_increments(a.get("skill_tested", "General"), analysis))
+    return doc.get(STATS_FIELD, {})
+
+
+def _average(total: Dict[str, float]) -> float:
+    return total.get("sum", 0) / total["count"] if total.get("count") else 0.0
+
+
+def summarize(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Averages from the running totals; O(skills + buckets), independent of answer count"""
+    answers = stats.get("answers", 0)
+    return {
+        "answers": answers,
+        "average_score": round(stats.get("score_sum", 0) / answers, 1) if answers else 0.0,
+        "skills": {skill: round(_average(total), 1) for skill, total in stats.get("skills", {}).items()},
+        "quality": {dim: round(_average(total), 1) for dim, total in stats.get("quality", {}).items()},
+        "histogram": {bucket: stats.get("histogram", {}).get(bucket, 0)
+                      for bucket in (str(b) for b in range(0, 100, HISTOGRAM_BUCKET_WIDTH))},
+    }
@@ -0,0 +1,84 @@
+"""
+Micro-batching for model calls
+- Requests arriving within a short window are sent as one multi-item call
+- A batch is flushed when it is full or when the window closes
+- Each caller awaits its own item's result
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+ANALYSIS_BATCH_ENABLED = os.getenv("ANALYSIS_BATCH_ENABLED", "false").lower() == "true"
+ANALYSIS_BATCH_MAX_ITEMS = int(os.getenv("ANALYSIS_BATCH_MAX_ITEMS", "8"))
+ANALYSIS_BATCH_WINDOW_MS = float(os.getenv("ANALYSIS_BATCH_WINDOW_MS", "50"))
+
+# handler(items) -> one result per item, in order (None for items it could not handle)
+BatchHandler = Callable[[List[Any]], Awaitable[List[Optional[Any]]]]
+
+
+class MicroBatcher:
+    """
+    Collects submitted items and runs them through the handler in batches.
+    The first item of a batch opens the window; the batch is sent when it
+    reaches max_items or the window closes, whichever comes first.
+    """
+
+    def __init__(self, handler: BatchHandler, max_items: int = ANALYSIS_BATCH_MAX_ITEMS,
+                 window_ms: float = ANALYSIS_BATCH_WINDOW_MS):
+        self._handler = handler
+        self.max_items = max_items
+        self.window_seconds = window_ms / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: Any) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_items:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = await self._handler([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+        # A short result list leaves the remaining items unanswered
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_items": self.max_items,
+            "window_ms": self.window_seconds * 1000,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
@@ -0,0 +1,169 @@
+"""
+LLM response cache
+- Keys: hash of model name + prompt template version + normalized inputs
+- In-memory LRU tier with TTL and size-based eviction
+- Optional MongoDB tier shared across workers (TTL index on expires_at)
+- Hit/miss counters for the health endpoint
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo.errors import PyMongoError
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_PERSISTENT = os.getenv("LLM_CACHE_PERSISTENT", "false").lower() == "true"
+COLLECTION_LLM_CACHE = "llm_cache"
+
+
+def _normalize(value: Any) -> Any:
+    """Case/whitespace-insensitive form of prompt inputs so trivial variations share a key"""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().lower()
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def make_cache_key(model_name: str, template_version: str, **inputs) -> str:
+    payload = json.dumps(
+        {"model": model_name, "template": template_version, "inputs": _normalize(inputs)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Bounded in-process cache; least recently used entries are evicted first"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class MongoCache:
+    """Persistent tier; MongoDB's TTL monitor removes expired entries"""
+
+    def __init__(self, get_database: Callable[[], Awaitable[Any]], ttl_seconds: float = LLM_CACHE_TTL_SECONDS):
+        self._get_database = get_database
+        self.ttl_seconds = ttl_seconds
+        self._index_ready = False
+
+    async def _collection(self):
+        db = await self._get_database()
+        if db is None:
+            return None
+        collection = db[COLLECTION_LLM_CACHE]
+        if not self._index_ready:
+            await collection.create_index("expires_at", expireAfterSeconds=0)
+            self._index_ready = True
+        return collection
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return None
+            doc = await collection.find_one({"_id": key, "expires_at": {"$gt": datetime.utcnow()}})
+        except PyMongoError:
+            return None
+        return doc["value"] if doc else None
+
+    async def set(self, key: str, value: Any):
+        try:
+            collection = await self._collection()
+            if collection is None:
+                return
+            await collection.replace_one(
+                {"_id": key},
+                {"_id": key, "value": value, "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl_seconds)},
+                upsert=True
+            )
+        except PyMongoError:
+            pass
+
+
+class ResponseCache:
+    """
+    Two-tier cache for parsed model responses.
+    Only successfully parsed outputs should be stored, never mock fallbacks.
+    """
+
+    def __init__(self, memory: Optional[LRUCache] = None, persistent: Optional[MongoCache] = None,
+                 enabled: bool = LLM_CACHE_ENABLED):
+        self.enabled = enabled
+        self.memory = memory if memory is not None else LRUCache()
+        self.persistent = persistent
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        value = self.memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(value)
+        if self.persistent is not None:
+            value = await self.persistent.get(key)
+            if value is not None:
+                self.persistent_hits += 1
+                self.memory.set(key, value)
+                return copy.deepcopy(value)
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        self.memory.set(key, copy.deepcopy(value))
+        if self.persistent is not None:
+            await self.persistent.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.persistent_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self.memory),
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "hit_rate": round((self.memory_hits + self.persistent_hits) / lookups, 3) if lookups else 0.0,
+        }
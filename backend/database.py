@@ -0,0 +1,266 @@
+"""
+MongoDB connection management
+- One process-wide client with a configurable connection pool
+- Cached "Mongo unavailable" state so development-mode fallback is cheap
+- Health-tracked reconnection
+- Idempotent index bootstrap for the queries main.py runs (upgrading older databases)
+- Command latency metrics per collection and operation
+"""
+
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, monitoring
+from pymongo.errors import OperationFailure, PyMongoError
+
+from logs import get_logger
+from metrics import db_operation_duration, db_operation_failures
+
+# ============================================================
+# Pool Configuration
+# ============================================================
+
+# MONGODB_URL is what docker-compose sets
+MONGODB_URI = os.getenv("MONGODB_URI") or os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+DB_NAME = "ai_interviews"
+COLLECTION_INTERVIEWS = "interviews"
+COLLECTION_QUESTIONS = "questions"
+COLLECTION_EVALUATIONS = "evaluations"
+COLLECTION_IDEMPOTENCY = "idempotency_keys"
+
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+# How long a failed connection attempt is remembered before we probe again
+MONGODB_RETRY_INTERVAL_SECONDS = float(os.getenv("MONGODB_RETRY_INTERVAL_SECONDS", "30"))
+
+log = get_logger("db")
+
+# ============================================================
+# Indexes
+# ============================================================
+
+# (keys, options) per collection; every endpoint lookup is covered by one of these
+INDEX_SPECS = {
+    COLLECTION_INTERVIEWS: [
+        ([("interview_id", ASCENDING)], {"unique": True, "name": "interview_id_unique"}),
+    ],
+    COLLECTION_QUESTIONS: [
+        ([("interview_id", ASCENDING), ("number", ASCENDING)], {"name": "interview_id_number"}),
+        ([("interview_id", ASCENDING), ("question_id", ASCENDING)], {"name": "interview_id_question_id"}),
+    ],
+    COLLECTION_EVALUATIONS: [
+        ([("interview_id", ASCENDING)], {"unique": True, "name": "interview_id_unique"}),
+    ],
+    COLLECTION_IDEMPOTENCY: [
+        # MongoDB's TTL monitor drops replayable responses once their window ends
+        ([("expires_at", ASCENDING)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    ],
+}
+
+
+# Unique indexes that replace an index earlier versions created on the same key:
+# collection -> (unique index name, key, field whose newest value wins among duplicates, old index names)
+UNIQUE_INDEX_UPGRADES = {
+    COLLECTION_EVALUATIONS: ("interview_id_unique", "interview_id", "generated_at", ["interview_id_1"]),
+}
+
+
+async def remove_duplicates(collection, key: str, newest_by: str) -> int:
+    """Delete all but the newest document for each duplicated key value; returns how many were deleted"""
+    pipeline = [
+        {"$sort": {newest_by: -1}},
+        {"$group": {"_id": f"${key}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        result = await collection.delete_many({"_id": {"$in": group["ids"][1:]}})
+        removed += result.deleted_count
+    return removed
+
+
+async def upgrade_unique_indexes(db: AsyncIOMotorDatabase):
+    """
+    Make room for the unique indexes in UNIQUE_INDEX_UPGRADES on databases
+    created before them: remove duplicates, then drop the old non-unique index
+    on the same key (create_index would otherwise fail with IndexOptionsConflict)
+    """
+    for collection_name, (name, key, newest_by, old_names) in UNIQUE_INDEX_UPGRADES.items():
+        collection = db[collection_name]
+        try:
+            existing = await collection.index_information()
+            if name in existing:
+                continue
+            removed = await remove_duplicates(collection, key, newest_by)
+            if removed:
+                log.warning("Removed duplicate documents before creating a unique index",
+                            extra={"index": name, "collection": collection_name, "removed": removed})
+            for old_name in old_names:
+                if old_name in existing:
+                    await collection.drop_index(old_name)
+                    log.info("Dropped superseded index", extra={"index": old_name, "collection": collection_name})
+        except OperationFailure as e:
+            # e.g. another worker dropped the old index first
+            log.warning("Could not upgrade index",
+                        extra={"index": name, "collection": collection_name, "error": str(e)})
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase):
+    """Create the indexes in INDEX_SPECS (no-op when they already exist)"""
+    await upgrade_unique_indexes(db)
+    for collection_name, specs in INDEX_SPECS.items():
+        for keys, options in specs:
+            try:
+                await db[collection_name].create_index(keys, **options)
+            except OperationFailure as e:
+                # e.g. duplicate interview_ids left over from before the unique index
+                log.warning("Could not create index",
+                            extra={"index": options.get("name"), "collection": collection_name, "error": str(e)})
+
+
+# ============================================================
+# Command Metrics
+# ============================================================
+
+# Handshakes, pings and the like are not collection operations
+UNTRACKED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue",
+                      "buildInfo", "getMore", "killCursors"}
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """
+    Times every command the driver sends, labelled by collection and operation
+    (find, insert, update, findAndModify, ...). Callbacks run on driver threads.
+    """
+
+    def __init__(self):
+        self._collections: Dict[Tuple[object, int], str] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        if event.command_name in UNTRACKED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else event.database_name
+            )
+
+    def _finish(self, event) -> Optional[str]:
+        with self._lock:
+            return self._collections.pop((event.connection_id, event.request_id), None)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        collection = self._finish(event)
+        if collection is not None:
+            db_operation_duration.observe(event.duration_micros / 1e6,
+                                          collection=collection, operation=event.command_name)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        collection = self._finish(event)
+        if collection is not None:
+            db_operation_duration.observe(event.duration_micros / 1e6,
+                                          collection=collection, operation=event.command_name)
+            db_operation_failures.inc(collection=collection, operation=event.command_name)
+
+
+class MongoConnectionManager:
+    """
+    Owns the single Motor client for this process.
+    The client is created once (at app startup) and shared by every request;
+    the driver handles per-operation socket checkout from its pool.
+    """
+
+    def __init__(self, uri: str = MONGODB_URI, db_name: str = DB_NAME):
+        self.uri = uri
+        self.db_name = db_name
+        self._client: Optional[AsyncIOMotorClient] = None
+        self._lock: Optional[asyncio.Lock] = None
+        # Monotonic timestamp until which Mongo is considered unavailable
+        self._unavailable_until = 0.0
+        self.healthy = False
+        self.last_error: Optional[str] = None
+
+    def _create_client(self) -> AsyncIOMotorClient:
+        return AsyncIOMotorClient(
+            self.uri,
+            minPoolSize=MONGODB_MIN_POOL_SIZE,
+            maxPoolSize=MONGODB_MAX_POOL_SIZE,
+            maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=[CommandMetricsListener()],
+        )
+
+    async def connect(self) -> Optional[AsyncIOMotorDatabase]:
+        """Create the pooled client and verify it with a single ping"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._client is not None:
+                return self._client[self.db_name]
+
+            client = self._create_client()
+            try:
+                await client.admin.command('ping')
+            except PyMongoError as e:
+                client.close()
+                self._mark_unavailable(e)
+                log.warning("MongoDB connection failed; using the in-memory store", extra={"error": str(e)})
+                return None
+
+            self._client = client
+            self.healthy = True
+            self.last_error = None
+            log.info("MongoDB pool ready", extra={"min_pool_size": MONGODB_MIN_POOL_SIZE,
+                                                  "max_pool_size": MONGODB_MAX_POOL_SIZE})
+            await ensure_indexes(client[self.db_name])
+            return client[self.db_name]
+
+    def _mark_unavailable(self, error: Exception):
+        self.healthy = False
+        self.last_error = str(error)
+        self._unavailable_until = time.monotonic() + MONGODB_RETRY_INTERVAL_SECONDS
+
+    async def get_database(self) -> Optional[AsyncIOMotorDatabase]:
+        """
+        Return the shared database handle, or None when MongoDB is unavailable.
+        A failed connection is cached for MONGODB_RETRY_INTERVAL_SECONDS so
+        requests don't each stall on server selection.
+        """
+        if self._client is not None:
+            return self._client[self.db_name]
+        if time.monotonic() < self._unavailable_until:
+            return None
+        return await self.connect()
+
+    async def check_health(self) -> bool:
+        """Ping the server and record the result; the pool reconnects on its own"""
+        if self._client is None:
+            return await self.get_database() is not None
+        try:
+            await self._client.admin.command('ping')
+            if not self.healthy:
+                log.info("MongoDB connection restored")
+            self.healthy = True
+            self.last_error = None
+        except PyMongoError as e:
+            self.healthy = False
+            self.last_error = str(e)
+        return self.healthy
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+        self.healthy = False
+
+
+mongo = MongoConnectionManager()
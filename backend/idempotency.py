@@ -0,0 +1,77 @@
+"""
+Idempotency keys for POST endpoints
+- A client sends the same Idempotency-Key header when it retries a request
+- The first request runs; its successful response is stored for a replay window
+- Retries inside the window get the stored response instead of a new interview
+  or a new model call; a retry while the first is still running gets 409
+- Reusing a key with a different request body is rejected with 422
+"""
+
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from logs import get_logger
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+IDEMPOTENCY_REPLAY_HEADER = "Idempotent-Replayed"
+# How long a completed response is replayed for
+IDEMPOTENCY_TTL_SECONDS = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# A request still running after this long is treated as abandoned and its key can be reused
+IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS = float(os.getenv("IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS", "120"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+
+# Record status values
+IDEMPOTENCY_PROCESSING = "processing"
+IDEMPOTENCY_COMPLETED = "completed"
+
+log = get_logger("api")
+
+
+def request_fingerprint(body: Any) -> str:
+    payload = json.dumps(jsonable_encoder(body), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def run_idempotent(store, scope: str, key: Optional[str], body: Any,
+                         handler: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run handler once per (scope, key). store is repos.idempotency.
+    Without a key the handler just runs. Only successful responses are stored;
+    if the handler raises, the key is released so the client can retry.
+    """
+    if not key:
+        return await handler()
+    if len(key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+        raise HTTPException(status_code=400,
+                            detail=f"{IDEMPOTENCY_HEADER} must be at most {IDEMPOTENCY_KEY_MAX_LENGTH} characters")
+
+    record_key = f"{scope}:{key}"
+    fingerprint = request_fingerprint(body)
+    existing = await store.claim(record_key, fingerprint, IDEMPOTENCY_PROCESSING_TIMEOUT_SECONDS)
+    if existing is not None:
+        if existing.get("fingerprint") != fingerprint:
+            raise HTTPException(status_code=422,
+                                detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+        if existing.get("status") != IDEMPOTENCY_COMPLETED:
+            raise HTTPException(status_code=409, detail="A request with this key is still in progress",
+                                headers={"Retry-After": "1"})
+        return JSONResponse(content=existing["response"], status_code=existing.get("status_code", 200),
+                            headers={IDEMPOTENCY_REPLAY_HEADER: "true"})
+
+    try:
+        response = await handler()
+    except Exception:
+        await store.release(record_key)
+        raise
+    try:
+        await store.complete(record_key, jsonable_encoder(response), 200, IDEMPOTENCY_TTL_SECONDS)
+    except Exception as e:
+        # The request itself succeeded; a retry will just run it again
+        log.warning("Could not store idempotent response", extra={"key": record_key, "error": str(e)})
+    return response
@@ -0,0 +1,93 @@
+"""
+In-process background jobs
+- Final report generation runs on worker tasks instead of inside request handlers
+- At most one queued/running job per interview; callers can await its result
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from logs import get_logger
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+# A pending/running report not picked up or finished within this long is assumed
+# abandoned (its worker died) and can be claimed by another worker
+REPORT_CLAIM_TTL_SECONDS = float(os.getenv("REPORT_CLAIM_TTL_SECONDS", "300"))
+
+log = get_logger("api")
+
+# Report status values stored on the interview document
+REPORT_PENDING = "pending"
+REPORT_RUNNING = "running"
+REPORT_DONE = "done"
+REPORT_FAILED = "failed"
+# When the current claim on an interview's report was taken (refreshed when it starts running)
+REPORT_CLAIMED_AT_FIELD = "report_claimed_at"
+
+
+class ReportJobQueue:
+    """
+    asyncio queue drained by a small pool of worker tasks.
+    Each job is keyed by interview_id; enqueueing an interview that already
+    has a job in flight returns the existing future instead of a new job.
+    """
+
+    def __init__(self, handler: Callable[[str], Awaitable[Any]], workers: int = REPORT_WORKERS):
+        self._handler = handler
+        self._worker_count = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, asyncio.Future] = {}
+
+    def _ensure_started(self):
+        if self._queue is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"report-worker-{i}")
+            for i in range(self._worker_count)
+        ]
+
+    async def _worker(self):
+        while True:
+            interview_id = await self._queue.get()
+            future = self._jobs.get(interview_id)
+            try:
+                result = await self._handler(interview_id)
+                if future is not None and not future.done():
+                    future.set_result(result)
+            except Exception as e:
+                log.error("Report job failed", extra={"interview_id": interview_id, "error": str(e)})
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            finally:
+                self._jobs.pop(interview_id, None)
+                self._queue.task_done()
+
+    def enqueue(self, interview_id: str) -> asyncio.Future:
+        """Queue report generation for an interview (no-op if one is already in flight)"""
+        self._ensure_started()
+        existing = self._jobs.get(interview_id)
+        if existing is not None:
+            return existing
+        future = asyncio.get_running_loop().create_future()
+        # Nobody may ever await this future; don't warn about unretrieved exceptions
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._jobs[interview_id] = future
+        self._queue.put_nowait(interview_id)
+        return future
+
+    def get(self, interview_id: str) -> Optional[asyncio.Future]:
+        """Future for an interview's in-flight job in this process, if any"""
+        return self._jobs.get(interview_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def stop(self):
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
@@ -0,0 +1,229 @@
+"""
+Incremental JSON extraction from model output
+- Single pass over the text; chunks can be fed as they stream in
+- Skips prose and markdown fences around the JSON value
+- Prefers an object (what the agents ask for) over arrays that appear before it
+- Tolerates trailing commas and truncated output (closes what was left open)
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+_CLOSERS = {"{": "}", "[": "]"}
+_OPEN = re.compile(r"[{\[]")
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+# A whole string literal, or a comma directly before a closing bracket
+_TRAILING_COMMA = re.compile(r'("(?:[^"\\]|\\.)*")|,\s*([}\]])', re.DOTALL)
+
+
+def strip_trailing_commas(text: str) -> str:
+    return _TRAILING_COMMA.sub(lambda m: m.group(1) or m.group(2), text)
+
+
+def loads_lenient(text: str) -> Optional[Any]:
+    """json.loads, retried once without trailing commas. Returns None on failure."""
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(strip_trailing_commas(text))
+    except ValueError:
+        return None
+
+
+class JsonExtractor:
+    """Finds the first JSON value of the expected type (an object by default) in model output.
+
+    feed() may be called with each streamed chunk; scanning resumes where it
+    left off, so the text is only walked once. finish() returns the parsed
+    value, repairing output that was cut off mid-value. A complete value of
+    another type (e.g. "[1]" in prose) is only returned if nothing better follows;
+    expect=None takes the first value of any type.
+    """
+
+    def __init__(self, expect: Optional[type] = dict):
+        self.expect = expect
+        self._fallback: Any = None
+        self._text = ""
+        self._pos = 0
+        self._start: Optional[int] = None
+        # Brackets that would close the open containers, innermost first
+        self._closing = ""
+        self._in_string = False
+        # (offset, closers) where the value can be cut and closed if truncated
+        self._cuts: List[Tuple[int, str]] = []
+        self.value: Any = None
+        self.done = False
+
+    def _reset_after_failed_candidate(self):
+        # Not JSON after all (e.g. braces in prose): resume just past its start
+        self._pos = self._start + 1
+        self._start = None
+        self._closing = ""
+        self._in_string = False
+        self._cuts = []
+
+    def feed(self, chunk: str) -> bool:
+        """Add more output; returns True once a complete value has been parsed"""
+        if self.done:
+            return True
+        self._text += chunk
+        text = self._text
+        while self._pos < len(text):
+            if self._in_string:
+                m = _STRING_SPECIAL.search(text, self._pos)
+                if m is None:
+                    self._pos = len(text)
+                    break
+                if m.group() == "\\":
+                    # Skip the escaped character, even if it hasn't arrived yet
+                    self._pos = m.start() + 2
+                else:
+                    self._in_string = False
+                    self._pos = m.end()
+                continue
+
+            if self._start is None:
+                m = _OPEN.search(text, self._pos)
+                if m is None:
+                    self._pos = len(text)
+                    break
+                self._start = m.start()
+                self._closing = _CLOSERS[m.group()]
+                # No cut right after the opening bracket: an empty value is never a useful repair
+                self._cuts = []
+                self._pos = m.end()
+                continue
+
+            m = _STRUCTURAL.search(text, self._pos)
+            if m is None:
+                self._pos = len(text)
+                break
+            ch = m.group()
+            i = m.start()
+            self._pos = m.end()
+            if ch == '"':
+                self._in_string = True
+            elif ch == ",":
+                self._cuts.append((i, self._closing))
+            elif ch in "{[":
+                self._closing = _CLOSERS[ch] + self._closing
+                self._cuts.append((m.end(), self._closing))
+            else:
+                if self._closing[0] != ch:
+                    self._reset_after_failed_candidate()
+                    continue
+                self._closing = self._closing[1:]
+                if not self._closing:
+                    value = loads_lenient(text[self._start:self._pos])
+                    if value is None:
+                        self._reset_after_failed_candidate()
+                        continue
+                    if self.expect is not None and not isinstance(value, self.expect):
+                        # Keep scanning after it; used only if no value of the expected type follows
+                        if self._fallback is None:
+                            self._fallback = value
+                        self._start = None
+                        continue
+                    self.value = value
+                    self.done = True
+                    return True
+        return False
+
+    def finish(self) -> Optional[Any]:
+        """Parsed value, or a best-effort repair of truncated output (None if nothing usable)"""
+        while not self.done and self._start is not None:
+            value = self._repair()
+            if value is not None:
+                if self.expect is None or isinstance(value, self.expect) or self._fallback is None:
+                    return value
+                return self._fallback
+            # Not JSON after all (e.g. an unclosed brace in prose): look for a value after it
+            self._reset_after_failed_candidate()
+            self.feed("")
+        return self.value if self.done else self._fallback
+
+    def _repair(self) -> Optional[Any]:
+        # Truncated: close the open string and containers as they stand...
+        tail = self._text[self._start:]
+        if self._in_string:
+            tail += '"'
+        value = loads_lenient(tail + self._closing)
+        if value:
+            return value
+
+        # ...otherwise drop the incomplete member and close at the last clean cut
+        # (an empty {} or [] is never a useful repair)
+        for offset, closers in reversed(self._cuts):
+            value = loads_lenient(self._text[self._start:offset] + closers)
+            if value:
+                return value
+        return None
+
+
+def extract_json(text: str, expect: Optional[type] = dict) -> Optional[Any]:
+    """Parse the first JSON value (of the expected type, if there is one) in a complete model response"""
+    if not text:
+        return None
+    extractor = JsonExtractor(expect)
+    extractor.feed(text)
+    return extractor.finish()
+
+
+class JsonArrayItemStream:
+    """Feed model output chunk by chunk; returns each object in a JSON array as soon as it closes.
+
+    Tracks nesting and string state across chunks so a question can be used
+    before the rest of the response has arrived.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._item_start: Optional[int] = None
+        self._item_depth = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        self._text += chunk
+        text = self._text
+        items = []
+        while self._pos < len(text):
+            if self._in_string:
+                m = _STRING_SPECIAL.search(text, self._pos)
+                if m is None:
+                    self._pos = len(text)
+                    break
+                if m.group() == "\\":
+                    self._pos = m.start() + 2
+                else:
+                    self._in_string = False
+                    self._pos = m.end()
+                continue
+
+            m = _STRUCTURAL.search(text, self._pos)
+            if m is None:
+                self._pos = len(text)
+                break
+            ch = m.group()
+            i = m.start()
+            self._pos = m.end()
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                if ch == "{" and self._stack and self._stack[-1] == "[" and self._item_start is None:
+                    self._item_start = i
+                    self._item_depth = len(self._stack)
+                self._stack.append(ch)
+            elif ch in "}]" and self._stack:
+                self._stack.pop()
+                if ch == "}" and self._item_start is not None and len(self._stack) == self._item_depth:
+                    item = loads_lenient(text[self._item_start:i + 1])
+                    if item is not None:
+                        items.append(item)
+                    self._item_start = None
+        return items
@@ -0,0 +1,161 @@
+"""
+Non-blocking model calls
+- Async Gemini calls (native async API, dedicated thread pool as fallback)
+- Token streaming for endpoints that forward partial output to the client
+- Global limit on in-flight LLM requests with per-call timeouts
+- Queue-depth and latency counters for the health endpoint
+- Per-agent latency and outcome metrics (metrics.py) and tracing spans
+"""
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Optional
+
+from metrics import gauge, llm_call_duration, llm_calls
+from tracing import record_span, span
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_CALL_TIMEOUT_SECONDS = float(os.getenv("LLM_CALL_TIMEOUT_SECONDS", "30"))
+
+
+class ModelCallLimiter:
+    """
+    Bounds the number of concurrent model calls for this process.
+    Callers beyond the limit wait in line; waiting and in-flight counts are tracked.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 timeout_seconds: float = LLM_CALL_TIMEOUT_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.timeout_seconds = timeout_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Only used for models without a native async API
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self.in_flight = 0
+        self.waiting = 0
+        self.max_waiting = 0
+        self.total_calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.total_latency_seconds = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _generate(self, model, prompt: str):
+        generate_async = getattr(model, "generate_content_async", None)
+        if generate_async is not None:
+            return await generate_async(prompt)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, model.generate_content, prompt)
+
+    async def _acquire(self) -> float:
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+        self.total_calls += 1
+        return time.perf_counter()
+
+    def _release(self, started: float):
+        self.total_latency_seconds += time.perf_counter() - started
+        self.in_flight -= 1
+        self._get_semaphore().release()
+
+    async def call(self, model, prompt: str, timeout: Optional[float] = None, agent: str = "unknown") -> Any:
+        """Run one model call under the concurrency limit and timeout"""
+        with span("llm", agent=agent, prompt_chars=len(prompt)):
+            return await self._call(model, prompt, timeout, agent)
+
+    async def _call(self, model, prompt: str, timeout: Optional[float], agent: str) -> Any:
+        queued = time.perf_counter()
+        started = await self._acquire()
+        outcome = "ok"
+        try:
+            return await asyncio.wait_for(
+                self._generate(model, prompt),
+                timeout=timeout if timeout is not None else self.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            outcome = "timeout"
+            raise
+        except Exception:
+            self.errors += 1
+            outcome = "error"
+            raise
+        finally:
+            self._release(started)
+            llm_call_duration.observe(time.perf_counter() - queued, agent=agent)
+            llm_calls.inc(agent=agent, outcome=outcome)
+
+    async def stream(self, model, prompt: str, timeout: Optional[float] = None,
+                     agent: str = "unknown") -> AsyncIterator[str]:
+        """
+        Yield response text chunks as the model produces them.
+        Holds a concurrency slot for the whole stream; the timeout bounds the
+        total stream duration. Models without a streaming async API yield once.
+        """
+        queued = time.perf_counter()
+        started = await self._acquire()
+        outcome = "ok"
+        deadline = time.monotonic() + (timeout if timeout is not None else self.timeout_seconds)
+        try:
+            generate_async = getattr(model, "generate_content_async", None)
+            if generate_async is None:
+                response = await asyncio.wait_for(self._generate(model, prompt), timeout=deadline - time.monotonic())
+                yield getattr(response, "text", None) or str(response)
+                return
+
+            response = await asyncio.wait_for(generate_async(prompt, stream=True), timeout=deadline - time.monotonic())
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout=deadline - time.monotonic())
+                except StopAsyncIteration:
+                    break
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            outcome = "timeout"
+            raise
+        except Exception:
+            self.errors += 1
+            outcome = "error"
+            raise
+        finally:
+            self._release(started)
+            llm_call_duration.observe(time.perf_counter() - queued, agent=agent)
+            llm_calls.inc(agent=agent, outcome=outcome)
+            # Not a context-managed span: the consumer runs between our yields
+            record_span("llm", queued, agent=agent, prompt_chars=len(prompt), streamed=True, outcome=outcome)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "total_calls": self.total_calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "avg_latency_ms": round(1000 * self.total_latency_seconds / self.total_calls, 1) if self.total_calls else 0.0,
+        }
+
+
+llm_limiter = ModelCallLimiter()
+
+gauge("llm_calls_in_flight", "Model calls holding a concurrency slot",
+      read_value=lambda: llm_limiter.in_flight)
+gauge("llm_calls_waiting", "Model calls waiting for a concurrency slot",
+      read_value=lambda: llm_limiter.waiting)
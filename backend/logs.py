@@ -0,0 +1,157 @@
+"""
+Structured, non-blocking logging
+- One JSON object per line (LOG_FORMAT=text for a readable local format)
+- Request paths only put records on a queue; a listener thread formats and writes them
+- Levels per subsystem: LOG_LEVEL_API, LOG_LEVEL_DB, LOG_LEVEL_LLM (default LOG_LEVEL)
+- DEBUG lines are sampled per trace, so a sampled request keeps all of its lines
+- Every record carries the current trace id (see tracing.py)
+"""
+
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from tracing import current_trace_id
+
+LOGGER_PREFIX = "interview"
+SUBSYSTEMS = ("api", "db", "llm")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+# Share of traces whose DEBUG lines are kept (only matters when a subsystem logs at DEBUG)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+# Records beyond this many waiting to be written are dropped rather than blocking a request
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# Attributes every LogRecord has; anything else was passed through extra= and is logged as a field
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "trace_id"}
+
+
+def get_logger(subsystem: str) -> logging.Logger:
+    """Logger for one subsystem: "api", "db" or "llm" """
+    return logging.getLogger(f"{LOGGER_PREFIX}.{subsystem}")
+
+
+class TraceContextFilter(logging.Filter):
+    """Captures the trace id while still on the request's task (the listener thread can't see it)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.trace_id = current_trace_id()
+        return True
+
+
+class DebugSampler(logging.Filter):
+    """Keeps DEBUG records for a fixed share of traces; higher levels always pass"""
+
+    def __init__(self, rate: float = LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.threshold = int(max(0.0, min(rate, 1.0)) * 10000)
+        self._untraced = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.threshold >= 10000:
+            return True
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            return zlib.crc32(trace_id.encode()) % 10000 < self.threshold
+        # Outside a request: keep every n-th line
+        self._untraced += 1
+        return self._untraced * self.threshold % 10000 < self.threshold
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of waiting"""
+
+    def __init__(self, log_queue: "queue.Queue"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, but keep them as separate fields
+        # (the default prepare merges the traceback into the message text)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        prepared = logging.makeLogRecord(vars(record))
+        prepared.msg = record.message
+        prepared.args = None
+        prepared.exc_info = None
+        return prepared
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "trace_id", None):
+            entry["trace_id"] = record.trace_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)-7s %(name)s [%(trace_id)s] %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        record.trace_id = getattr(record, "trace_id", None) or "-"
+        extras = {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES and not k.startswith("_")}
+        text = super().format(record)
+        if extras:
+            first, _, rest = text.partition("\n")
+            text = first + " " + " ".join(f"{k}={v}" for k, v in extras.items()) + (f"\n{rest}" if rest else "")
+        return text
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+queue_handler: Optional[NonBlockingQueueHandler] = None
+
+
+def configure_logging(stream=None):
+    """Attach the queue handler to the subsystem loggers and start the writer thread (idempotent)"""
+    global _listener, queue_handler
+    if queue_handler is None:
+        queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        queue_handler.addFilter(TraceContextFilter())
+        queue_handler.addFilter(DebugSampler())
+
+        root = logging.getLogger(LOGGER_PREFIX)
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(queue_handler)
+        # Don't also go through uvicorn's (synchronous) root handlers
+        root.propagate = False
+        for subsystem in SUBSYSTEMS:
+            get_logger(subsystem).setLevel(os.getenv(f"LOG_LEVEL_{subsystem.upper()}", LOG_LEVEL).upper())
+
+    if _listener is None:
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+        _listener = logging.handlers.QueueListener(queue_handler.queue, output, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -3,50 +3,101 @@ Agentic AI Interview Platform Backend
 - Dynamic question generation based on selected skills
 - AI-powered answer verification  
 - Dynamic report generation
-- Everything powered by Gemini AI (agentic process)
+- Everything powered by Gemini AI (agentic process); MODEL_PROVIDER=fake for offline testing
 - Uses MongoDB for data persistence
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, AsyncIterator, Callable, Set, Union
 from datetime import datetime
 from dotenv import load_dotenv
 import os
 import json
 import uuid
-from pymongo import MongoClient
-from pymongo.errors import ServerSelectionTimeoutError
-import google.generativeai as genai
+import asyncio
+from contextlib import asynccontextmanager
 import re
 from typing import Tuple
 
 # Load environment variables
 load_dotenv()
 
+from database import mongo
+from repositories import Repositories, answer_claim_path
+from memory_store import MemoryRepositories, MemoryStore
+from llm import llm_limiter
+from model_providers import MODEL_PROVIDER, create_provider
+from json_stream import JsonArrayItemStream, JsonExtractor, extract_json
+from aggregates import STATS_FIELD, answer_increments, stats_from_answers, summarize
+from batching import ANALYSIS_BATCH_ENABLED, MicroBatcher
+from schemas import AnswerAnalysis, GeneratedQuestion, InterviewReport, validate_output, validate_questions
+from cache import LLM_CACHE_PERSISTENT, MongoCache, ResponseCache, make_cache_key
+from question_bank import QuestionBank
+from jobs import ReportJobQueue, REPORT_CLAIMED_AT_FIELD, REPORT_RUNNING, REPORT_DONE, REPORT_FAILED
+from idempotency import IDEMPOTENCY_HEADER, run_idempotent
+from metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, json_parse_failures, llm_fallbacks, render_latest
+from logs import configure_logging, get_logger, shutdown_logging
+from tracing import TracingMiddleware, current_trace_id, exporter as trace_exporter, install_log_filter, span, start_trace
+
+# "mongo": MongoDB, falling back to the in-memory store while it is unreachable
+# "memory": always the in-memory store (demos, load tests)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "mongo").lower()
+# Worker processes per instance (uvicorn also reads WEB_CONCURRENCY as its --workers default)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+# Several workers or replicas must share session state through MongoDB: per-process
+# memory would lose a candidate's session whenever a request lands on another worker
+REQUIRE_SHARED_STORE = WEB_CONCURRENCY > 1 or os.getenv("REQUIRE_SHARED_STORE", "false").lower() == "true"
+REPORT_WAIT_TIMEOUT_SECONDS = float(os.getenv("REPORT_WAIT_TIMEOUT_SECONDS", "60"))
+# How often complete re-reads report_status while another worker generates the report
+REPORT_POLL_INTERVAL_SECONDS = 0.5
+QUESTIONS_PER_INTERVIEW = 8
+# How long next-question waits for a still-streaming question before answering 503
+QUESTION_WAIT_TIMEOUT_SECONDS = float(os.getenv("QUESTION_WAIT_TIMEOUT_SECONDS", "20"))
+QUESTION_POLL_INTERVAL_SECONDS = 0.25
+# A submit holds its question while the answer is analyzed; a claim older than
+# this is treated as abandoned (the worker died mid-analysis) and can be taken over
+ANSWER_CLAIM_TTL_SECONDS = float(os.getenv("ANSWER_CLAIM_TTL_SECONDS", "120"))
+# Compare-and-set retries before a submit gives up with 409
+ANSWER_CLAIM_ATTEMPTS = 5
+
+configure_logging()
+api_log = get_logger("api")
+llm_log = get_logger("llm")
+
 # Configuration
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017")
-DB_NAME = "ai_interviews"
-COLLECTION_INTERVIEWS = "interviews"
-COLLECTION_QUESTIONS = "questions"
-COLLECTION_EVALUATIONS = "evaluations"
-
-# Validate API key
-if not GEMINI_API_KEY:
-    print("⚠️  WARNING: GEMINI_API_KEY not found. Using development mode.")
+# Validate API key (the fake provider doesn't need one)
+if MODEL_PROVIDER == "gemini" and not GEMINI_API_KEY:
+    llm_log.warning("GEMINI_API_KEY not found; using development mode with mock AI responses")
     GEMINI_API_KEY = "development_mode"
     DEVELOPMENT_MODE = True
 else:
     DEVELOPMENT_MODE = False
 
-# Initialize Gemini AI
-if not DEVELOPMENT_MODE:
-    genai.configure(api_key=GEMINI_API_KEY)
+# Models for the agents come from the configured provider
+model_provider = None if DEVELOPMENT_MODE else create_provider(MODEL_PROVIDER, api_key=GEMINI_API_KEY)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared MongoDB pool on startup and close it on shutdown"""
+    configure_logging()
+    if REQUIRE_SHARED_STORE and STORAGE_BACKEND == "memory":
+        raise RuntimeError("STORAGE_BACKEND=memory can't be shared between workers; use MongoDB "
+                           "or run a single worker (WEB_CONCURRENCY=1)")
+    if STORAGE_BACKEND != "memory":
+        await mongo.connect()
+    yield
+    await report_jobs.stop()
+    await question_bank.stop()
+    mongo.close()
+    trace_exporter.close()
+    shutdown_logging()
 
 # Initialize FastAPI
-app = FastAPI(title="Agentic Interview AI Platform")
+app = FastAPI(title="Agentic Interview AI Platform", lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -55,90 +106,68 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets the frontend tell a retryable 409 from a final one
+    expose_headers=["Retry-After"],
 )
+# Request latency, status and in-flight metrics per route (served at /metrics)
+app.add_middleware(MetricsMiddleware)
+# Outermost: one trace per request, X-Trace-Id and opt-in Server-Timing on every response
+app.add_middleware(TracingMiddleware)
+install_log_filter()
 
 # ============================================================
 # MongoDB Connection
 # ============================================================
 
-def get_mongodb_client():
-    """Get MongoDB client with connection pooling"""
-    try:
-        client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        client.admin.command('ping')
-        return client
-    except ServerSelectionTimeoutError:
-        print("⚠️  MongoDB connection failed. Using development mode.")
-        return None
-
-def get_database():
-    """Get database instance"""
-    client = get_mongodb_client()
-    if client is None:
+async def get_database():
+    """Get the shared database instance (None when running without MongoDB)"""
+    if STORAGE_BACKEND == "memory":
         return None
-    return client[DB_NAME]
+    return await mongo.get_database()
 
 
-# In-memory store used when MongoDB is not available (development mode)
-DEV_STORE: Dict[str, Dict[str, Any]] = {
-    "interviews": {},  # interview_id -> interview_doc
-    "questions": {}    # interview_id -> list of question docs
-}
-
-
-# ================= Helper: Robust model response parsing =================
-def extract_json_from_text(text: str) -> Optional[str]:
-    """Attempt to extract a JSON object or array from arbitrary model text.
-
-    Returns the JSON substring if found, else None.
-    """
-    if not text:
-        return None
+# In-memory store used when MongoDB is not available (development mode);
+# bounded and TTL-evicted so long-running demo/load-test processes don't grow forever
+dev_store = MemoryStore()
+memory_repositories = MemoryRepositories(dev_store)
 
-    # Find first JSON object/array start
-    for start_char in ('{', '['):
-        start_idx = text.find(start_char)
-        if start_idx == -1:
-            continue
+# Both implementations expose the same repository methods, so endpoints have one code path
+Storage = Union[Repositories, MemoryRepositories]
 
-        stack = []
-        for i in range(start_idx, len(text)):
-            ch = text[i]
-            if ch in '{[':
-                stack.append(ch)
-            elif ch in '}]':
-                if not stack:
-                    break
-                open_ch = stack.pop()
-                if (open_ch == '{' and ch != '}') or (open_ch == '[' and ch != ']'):
-                    break
-                if not stack:
-                    candidate = text[start_idx:i+1]
-                    return candidate
 
-    # Fallback: regex to grab first {...}
-    m = re.search(r"\{(?:[^{}]|(?R))*\}", text, re.DOTALL)
-    if m:
-        return m.group(0)
+async def get_repositories() -> Storage:
+    """Repositories over MongoDB, or over the in-memory store when running without it"""
+    db = await get_database()
+    if db is None:
+        if REQUIRE_SHARED_STORE:
+            # Serving from this worker's memory would fork the session state
+            raise HTTPException(status_code=503, detail="Database unavailable, please retry",
+                                headers={"Retry-After": "5"})
+        return memory_repositories
+    return Repositories(db)
 
-    return None
 
+# ================= Helper: Robust model response parsing =================
+def safe_parse_json_from_model(text: str, agent: str = "unknown") -> Optional[Dict[str, Any]]:
+    """Extract the first JSON value from model text and parse it. Returns None on failure."""
+    with span("json.extract", agent=agent, chars=len(text or "")):
+        try:
+            parsed = extract_json(text)
+        except Exception:
+            parsed = None
+    if parsed is None:
+        json_parse_failures.inc(agent=agent)
+    return parsed
 
-def safe_parse_json_from_model(text: str) -> Optional[Dict[str, Any]]:
-    """Extract JSON substring and parse it into Python object. Returns None on failure."""
-    try:
-        json_sub = extract_json_from_text(text)
-        if not json_sub:
-            return None
-        return json.loads(json_sub)
-    except Exception:
-        return None
 
+async def call_model_safe(model, prompt: str, agent: str = "unknown") -> str:
+    """Call the generative model without blocking the event loop and return raw text output.
 
-def call_model_safe(model, prompt: str) -> str:
-    """Call the generative model safely and return raw text output."""
+    Calls share a process-wide concurrency limit and time out after LLM_CALL_TIMEOUT_SECONDS.
+    agent labels the call in the metrics.
+    """
     try:
-        response = model.generate_content(prompt)
+        response = await llm_limiter.call(model, prompt, agent=agent)
         # response may expose .text or be a string-like object
         resp_text = getattr(response, 'text', None)
         if resp_text is None:
@@ -148,6 +177,57 @@ def call_model_safe(model, prompt: str) -> str:
         # Re-raise so callers can fallback
         raise
 
+
+# Corrective re-asks allowed when local repair can't make an output valid
+LLM_REPAIR_REASKS = int(os.getenv("LLM_REPAIR_REASKS", "1"))
+
+# validate(parsed) -> (clean value, None) or (None, reason it was rejected)
+OutputValidator = Callable[[Any], Tuple[Optional[Any], Optional[str]]]
+
+
+def build_reask_prompt(prompt: str, previous_output: str, reason: str) -> str:
+    return f"""{prompt}
+
+Your previous reply could not be used ({reason}):
+{previous_output[:2000]}
+
+Return ONLY the corrected JSON in the format above."""
+
+
+async def validated_model_output(model, prompt: str, response_text: str, parsed: Any,
+                                 validate: OutputValidator, agent: str = "unknown") -> Optional[Any]:
+    """Validate (and locally repair) a parsed model response.
+
+    Only when repair fails is the model asked again, with the validation errors,
+    at most LLM_REPAIR_REASKS times. Returns None if no usable output was produced.
+    """
+    for attempt in range(LLM_REPAIR_REASKS + 1):
+        value, reason = validate(parsed)
+        if value is not None:
+            return value
+        if attempt == LLM_REPAIR_REASKS:
+            break
+        llm_log.info("Model output failed validation; asking again", extra={"agent": agent, "reason": reason})
+        response_text = await call_model_safe(model, build_reask_prompt(prompt, response_text, reason), agent)
+        parsed = safe_parse_json_from_model(response_text, agent)
+    return None
+
+
+async def call_model_structured(model, prompt: str, validate: OutputValidator,
+                                agent: str = "unknown") -> Optional[Any]:
+    """call_model_safe + JSON extraction + schema validation with a bounded re-ask"""
+    response_text = await call_model_safe(model, prompt, agent)
+    return await validated_model_output(model, prompt, response_text,
+                                        safe_parse_json_from_model(response_text, agent), validate, agent)
+
+
+# Bump when a prompt template or the cached output shape changes so stale responses are not reused
+QUESTION_PROMPT_VERSION = "questions-v2"
+ANALYSIS_PROMPT_VERSION = "analysis-v2"
+
+# Parsed model outputs keyed on model + template version + normalized inputs
+response_cache = ResponseCache(persistent=MongoCache(get_database) if LLM_CACHE_PERSISTENT else None)
+
 # ============================================================
 # Pydantic Models
 # ============================================================
@@ -165,6 +245,8 @@ class InterviewSetupRequest(BaseModel):
     experience: str  # "junior", "mid", "senior"
     selected_skills: List[SkillSelection]
     interview_duration_minutes: int = 30
+    # Return immediately and stream questions in (question 1 is served as soon as it exists)
+    stream_questions: bool = False
 
 class InterviewRecord(BaseModel):
     """Single Q&A record"""
@@ -294,6 +376,21 @@ def get_mock_questions(role: str, skills: List[Dict], total: int = 8):
     
     return questions
 
+def fill_with_mock_questions(questions: List[Dict[str, Any]], role: str, skills: List[Dict],
+                             total: int) -> List[Dict[str, Any]]:
+    """Top a short question set up to total from the mock set, skipping repeated texts and ids"""
+    filled = list(questions)
+    asked_texts = {q["question"] for q in filled}
+    seen_ids = {q["id"] for q in filled}
+    for q in get_mock_questions(role, skills, total):
+        if len(filled) >= total:
+            break
+        if q["question"] in asked_texts or q["id"] in seen_ids:
+            continue
+        filled.append({**q, "number": len(filled) + 1})
+        seen_ids.add(q["id"])
+    return filled
+
 def get_mock_analysis(answer: str, expected_key_points: Optional[List[str]] = None):
     """Generate smarter mock analysis for development mode.
 
@@ -380,11 +477,20 @@ def get_mock_analysis(answer: str, expected_key_points: Optional[List[str]] = No
 
 def get_mock_report(candidate_name: str, role: str, answers_count: int, 
                     interview_data: Optional[List[Dict]] = None,
-                    individual_scores: Optional[Dict[str, float]] = None):
+                    individual_scores: Optional[Dict[str, float]] = None,
+                    stats: Optional[Dict[str, Any]] = None):
     """Generate DYNAMIC mock report based on actual answer scores - COMPLETELY FIXED"""
     
+    # PRIORITY 0: Running totals kept on each answer (no pass over the answers)
+    if stats and stats.get("answers"):
+        summary = summarize(stats)
+        overall = int(summary["average_score"])
+        technical = overall
+        communication = int(summary["quality"].get("communication", 60))
+        cultural = int(summary["quality"].get("depth", 65))
+    
     # PRIORITY 1: Calculate from actual interview_data (complete answer analysis)
-    if interview_data:
+    elif interview_data:
         # Extract all answer scores
         all_scores = [qa.get('overall_score', 0) for qa in interview_data if qa.get('overall_score')]
         
@@ -505,30 +611,33 @@ class Agentic_QuestionGenerator:
     
     def __init__(self, model_name="gemini-1.5-flash"):
         self.model_name = model_name
+        # Label for this agent's model calls in the metrics
+        self.agent = type(self).__name__
         if not DEVELOPMENT_MODE:
-            self.model = genai.GenerativeModel(model_name)
+            self.model = model_provider.get_model(model_name)
         self.conversation_history = []
     
-    def generate_initial_questions(
-        self,
-        candidate_name: str,
-        role: str,
-        experience: str,
-        selected_skills: List[Dict[str, str]],
-        total_questions: int = 8,
-        exclude_question_ids: Optional[List[str]] = None
-    ) -> List[Dict[str, Any]]:
-        """
-        Agentic process: Generate initial question set
-        - Considers role and skills
-        - Matches experience level
-        - Creates contextual, flowing questions
-        """
-        
-        if DEVELOPMENT_MODE:
-            print("🔧 Development mode: Using mock questions")
-            return get_mock_questions(role, selected_skills, total_questions)
-        
+    def _cache_key(self, role: str, experience: str, selected_skills: List[Dict[str, str]],
+                   total_questions: int, exclude_question_ids: Optional[List[str]],
+                   difficulty: Optional[str] = None) -> str:
+        # Candidate name only personalizes the prompt wording, so it is left out
+        # of the key: candidates for the same role/skills share cached questions
+        return make_cache_key(
+            self.model_name,
+            QUESTION_PROMPT_VERSION,
+            role=role,
+            experience=experience,
+            skills=sorted(selected_skills, key=lambda s: s.get("skill_name", "")),
+            total_questions=total_questions,
+            exclude_question_ids=sorted(exclude_question_ids or []),
+            # Only present for single-difficulty sets, so existing keys are unchanged
+            **({"difficulty": difficulty} if difficulty else {})
+        )
+
+    def _build_prompt(self, candidate_name: str, role: str, experience: str,
+                      selected_skills: List[Dict[str, str]], total_questions: int,
+                      exclude_question_ids: Optional[List[str]], difficulty: Optional[str] = None,
+                      exclude_questions: Optional[List[str]] = None) -> str:
         skills_str = ", ".join([
             f"{s['skill_name']} ({s['proficiency_level']})"
             for s in selected_skills
@@ -536,8 +645,13 @@ class Agentic_QuestionGenerator:
         exclude_text = ""
         if exclude_question_ids:
             exclude_text = "\nEXCLUDE THESE QUESTION IDS (do not repeat): " + ", ".join(exclude_question_ids) + "\n"
+        if exclude_questions:
+            exclude_text += "\nDO NOT REPEAT OR REPHRASE THESE EXISTING QUESTIONS:\n" + \
+                "\n".join(f"- {text}" for text in exclude_questions) + "\n"
+        flow = (f"Are all of {difficulty.upper()} difficulty (set \"difficulty\": \"{difficulty}\" on every question)"
+                if difficulty else "Create a natural flow (start easier, progressively harder)")
         
-        prompt = f"""You are an expert technical interviewer for a {role.upper()} position.
+        return f"""You are an expert technical interviewer for a {role.upper()} position.
 
 CONTEXT:
 - Candidate: {candidate_name}
@@ -548,7 +662,7 @@ CONTEXT:
 TASK: Generate {total_questions} technical interview questions that:
 1. Are specifically tailored to the candidate's selected skills
 2. Match their experience level ({experience})
-3. Create a natural flow (start easier, progressively harder)
+3. {flow}
 4. Mix different question types (theory, practical, problem-solving, communication)
 5. Are designed to reveal genuine competency
 
@@ -558,7 +672,7 @@ IMPORTANT:
 - Make questions conversational and not robotic
 - Avoid generic questions - be specific to their skills
 - Distribute questions across different skills
-
+{exclude_text}
 Return ONLY valid JSON (no markdown, no code blocks):
 {{
   "questions": [
@@ -574,23 +688,122 @@ Return ONLY valid JSON (no markdown, no code blocks):
     }}
   ]
 }}"""
+    
+    async def generate_initial_questions(
+        self,
+        candidate_name: str,
+        role: str,
+        experience: str,
+        selected_skills: List[Dict[str, str]],
+        total_questions: int = 8,
+        exclude_question_ids: Optional[List[str]] = None,
+        difficulty: Optional[str] = None,
+        exclude_questions: Optional[List[str]] = None,
+        use_cache: bool = True,
+        fill_missing: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Agentic process: Generate initial question set
+        - Considers role and skills
+        - Matches experience level
+        - Creates contextual, flowing questions (or all at one difficulty)
+        exclude_questions lists texts the model must not repeat; use_cache=False
+        always asks the model (question bank refills want new questions).
+        A short set (e.g. repaired from truncated output) is never cached; it is
+        topped up from the mock questions unless fill_missing=False.
+        """
+        
+        if DEVELOPMENT_MODE:
+            llm_log.debug("Development mode: using mock questions")
+            return get_mock_questions(role, selected_skills, total_questions)
+        
+        cache_key = self._cache_key(role, experience, selected_skills, total_questions, exclude_question_ids,
+                                    difficulty)
+        cached = await response_cache.get(cache_key) if use_cache else None
+        if cached is not None:
+            llm_log.debug("Using cached questions", extra={"agent": self.agent})
+            return cached
+        
+        prompt = self._build_prompt(candidate_name, role, experience, selected_skills,
+                                    total_questions, exclude_question_ids, difficulty, exclude_questions)
         
         try:
-            response_text = call_model_safe(self.model, prompt)
-            parsed = safe_parse_json_from_model(response_text)
-            if parsed and isinstance(parsed, dict):
-                return parsed.get("questions", [])
-            # final fallback: try direct json.loads of raw text
-            try:
-                parsed_raw = json.loads(response_text)
-                return parsed_raw.get("questions", [])
-            except Exception:
-                print("⚠️  Could not parse model JSON output; falling back to mock questions")
-                return get_mock_questions(role, selected_skills, total_questions)
+            questions = await call_model_structured(
+                self.model, prompt, lambda parsed: validate_questions(parsed, total_questions), self.agent
+            )
+            if questions and len(questions) >= total_questions:
+                if use_cache:
+                    await response_cache.set(cache_key, questions)
+                return questions
+            if questions:
+                llm_log.warning("Short question set from the model",
+                                extra={"agent": self.agent, "missing": total_questions - len(questions)})
+                if not fill_missing:
+                    return questions
+                llm_fallbacks.inc(agent=self.agent)
+                return fill_with_mock_questions(questions, role, selected_skills, total_questions)
+            llm_log.warning("No valid questions from the model; falling back to mock questions",
+                            extra={"agent": self.agent})
         except Exception as e:
-            print(f"❌ Error generating questions: {e}")
-            print("🔧 Falling back to mock questions")
-            return get_mock_questions(role, selected_skills, total_questions)
+            llm_log.warning("Question generation failed; falling back to mock questions",
+                            extra={"agent": self.agent, "error": str(e)})
+        llm_fallbacks.inc(agent=self.agent)
+        return get_mock_questions(role, selected_skills, total_questions)
+
+    async def stream_initial_questions(
+        self,
+        candidate_name: str,
+        role: str,
+        experience: str,
+        selected_skills: List[Dict[str, str]],
+        total_questions: int = 8
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of generate_initial_questions
+        Yields each question as soon as its JSON object is complete in the model output.
+        If the stream fails or comes up short, the rest is filled from mock questions.
+        """
+        
+        if DEVELOPMENT_MODE:
+            for q in get_mock_questions(role, selected_skills, total_questions):
+                yield q
+            return
+        
+        cache_key = self._cache_key(role, experience, selected_skills, total_questions, None)
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            for q in cached:
+                yield q
+            return
+        
+        prompt = self._build_prompt(candidate_name, role, experience, selected_skills, total_questions, None)
+        
+        emitted = []
+        items = JsonArrayItemStream()
+        try:
+            async for text in llm_limiter.stream(self.model, prompt, agent=self.agent):
+                for item in items.feed(text):
+                    q, _ = validate_output(GeneratedQuestion, item)
+                    if q is not None and len(emitted) < total_questions:
+                        emitted.append(q)
+                        yield q
+        except Exception as e:
+            llm_log.warning("Question stream failed", extra={"agent": self.agent, "error": str(e)})
+        
+        if len(emitted) >= total_questions:
+            await response_cache.set(cache_key, emitted)
+            return
+        
+        llm_log.warning("Filling questions from the mock set",
+                        extra={"agent": self.agent, "missing": total_questions - len(emitted)})
+        llm_fallbacks.inc(agent=self.agent)
+        asked_texts = {q["question"] for q in emitted}
+        for q in get_mock_questions(role, selected_skills, total_questions):
+            if len(emitted) >= total_questions:
+                break
+            if q["question"] not in asked_texts:
+                emitted.append(q)
+                yield q
 
 # ============================================================
 # Agentic AI Answer Analyzer
@@ -602,31 +815,31 @@ class Agentic_AnswerAnalyzer:
     Evaluates: technical accuracy, depth, communication, completeness
     """
     
-    def __init__(self, model_name="gemini-1.5-flash"):
+    def __init__(self, model_name="gemini-1.5-flash", batch_enabled: bool = ANALYSIS_BATCH_ENABLED):
         self.model_name = model_name
+        self.agent = type(self).__name__
         if not DEVELOPMENT_MODE:
-            self.model = genai.GenerativeModel(model_name)
+            self.model = model_provider.get_model(model_name)
+        # Optional: answers arriving close together share one model call
+        self.batcher = MicroBatcher(self.analyze_batch) if batch_enabled else None
     
-    def analyze_single_answer(
-        self,
-        question_text: str,
-        answer_text: str,
-        expected_key_points: List[str],
-        skill_tested: str,
-        difficulty: str
-    ) -> Dict[str, Any]:
-        """
-        Agentic analysis of a single answer
-        Returns structured evaluation with scores and feedback
-        """
-        
-        if DEVELOPMENT_MODE:
-            print(f"🔧 Development mode: Using mock analysis")
-            return get_mock_analysis(answer_text, expected_key_points)
-        
+    def _cache_key(self, question_text: str, answer_text: str, expected_key_points: List[str],
+                   skill_tested: str, difficulty: str) -> str:
+        return make_cache_key(
+            self.model_name,
+            ANALYSIS_PROMPT_VERSION,
+            question_text=question_text,
+            answer_text=answer_text,
+            expected_key_points=expected_key_points,
+            skill_tested=skill_tested,
+            difficulty=difficulty
+        )
+
+    def _build_prompt(self, question_text: str, answer_text: str, expected_key_points: List[str],
+                      skill_tested: str, difficulty: str) -> str:
         expected_points_str = "\n".join([f"- {p}" for p in expected_key_points])
         
-        prompt = f"""You are an expert technical interviewer analyzing a candidate's answer.
+        return f"""You are an expert technical interviewer analyzing a candidate's answer.
 
 QUESTION: {question_text}
 SKILL TESTED: {skill_tested}
@@ -650,22 +863,194 @@ Return ONLY valid JSON (no markdown):
   "depth_of_knowledge": "superficial/adequate/good/deep",
   "feedback_to_candidate": "constructive 2-3 sentence feedback"
 }}"""
+
+    def _build_batch_prompt(self, items: List[Dict[str, Any]]) -> str:
+        blocks = []
+        for index, item in enumerate(items):
+            expected_points_str = "\n".join([f"- {p}" for p in item["expected_key_points"]])
+            blocks.append(f"""### ITEM {index}
+QUESTION: {item["question_text"]}
+SKILL TESTED: {item["skill_tested"]}
+DIFFICULTY: {item["difficulty"]}
+
+EXPECTED KEY POINTS:
+{expected_points_str}
+
+CANDIDATE'S ANSWER:
+{item["answer_text"]}""")
+        items_text = "\n\n".join(blocks)
+        
+        return f"""You are an expert technical interviewer analyzing candidates' answers.
+Each item below is a separate question and answer; assess each one independently.
+
+{items_text}
+
+TASK: Analyze every item comprehensively and provide structured feedback for each.
+
+Return ONLY valid JSON (no markdown), with one entry per item:
+{{
+  "analyses": [
+    {{
+      "index": 0,
+      "overall_score": 0-100,
+      "key_points_covered": ["list of points they mentioned"],
+      "missing_points": ["important points they missed"],
+      "communication_quality": "poor/adequate/good/excellent",
+      "technical_accuracy": "poor/adequate/good/excellent",
+      "depth_of_knowledge": "superficial/adequate/good/deep",
+      "feedback_to_candidate": "constructive 2-3 sentence feedback"
+    }}
+  ]
+}}"""
+
+    async def analyze_batch(self, items: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Analyze several answers in one model call
+        Returns one validated analysis per item, or None for items the model
+        got wrong or left out (callers re-run those on their own)
+        """
+        if len(items) == 1:
+            # Nothing to share: the caller's single-item path handles it
+            return [None]
         
-        try:
-            response_text = call_model_safe(self.model, prompt)
-            parsed = safe_parse_json_from_model(response_text)
-            if parsed and isinstance(parsed, dict):
-                return parsed
-            # try direct load
+        response_text = await call_model_safe(self.model, self._build_batch_prompt(items), self.agent)
+        parsed = safe_parse_json_from_model(response_text, self.agent)
+        entries = parsed.get("analyses") if isinstance(parsed, dict) else parsed
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        for position, entry in enumerate(entries if isinstance(entries, list) else []):
+            if not isinstance(entry, dict):
+                continue
+            index = entry.get("index", position)
+            if not isinstance(index, int) or not 0 <= index < len(items) or results[index] is not None:
+                continue
+            results[index], _ = validate_output(AnswerAnalysis, entry)
+        return results
+    
+    async def analyze_single_answer(
+        self,
+        question_text: str,
+        answer_text: str,
+        expected_key_points: List[str],
+        skill_tested: str,
+        difficulty: str
+    ) -> Dict[str, Any]:
+        """
+        Agentic analysis of a single answer
+        Returns structured evaluation with scores and feedback
+        """
+        
+        if DEVELOPMENT_MODE:
+            llm_log.debug("Development mode: using mock analysis")
+            return get_mock_analysis(answer_text, expected_key_points)
+        
+        cache_key = self._cache_key(question_text, answer_text, expected_key_points, skill_tested, difficulty)
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            llm_log.debug("Using cached analysis", extra={"agent": self.agent})
+            return cached
+        
+        if self.batcher is not None:
             try:
-                return json.loads(response_text)
-            except Exception:
-                print("⚠️  Could not parse model JSON for analysis; falling back to mock analysis")
-                return get_mock_analysis(answer_text, expected_key_points)
+                analysis = await self.batcher.submit({
+                    "question_text": question_text,
+                    "answer_text": answer_text,
+                    "expected_key_points": expected_key_points,
+                    "skill_tested": skill_tested,
+                    "difficulty": difficulty
+                })
+            except Exception as e:
+                llm_log.warning("Batched answer analysis failed", extra={"agent": self.agent, "error": str(e)})
+                analysis = None
+            if analysis is not None:
+                await response_cache.set(cache_key, analysis)
+                return analysis
+            # Partial failure: analyze this answer on its own
+        
+        prompt = self._build_prompt(question_text, answer_text, expected_key_points, skill_tested, difficulty)
+        
+        try:
+            analysis = await call_model_structured(
+                self.model, prompt, lambda parsed: validate_output(AnswerAnalysis, parsed), self.agent
+            )
+            if analysis is not None:
+                await response_cache.set(cache_key, analysis)
+                return analysis
+            llm_log.warning("No valid analysis from the model; falling back to mock analysis",
+                            extra={"agent": self.agent})
         except Exception as e:
-            print(f"❌ Error analyzing answer: {e}")
-            print("🔧 Falling back to mock analysis")
-            return get_mock_analysis(answer_text, expected_key_points)
+            llm_log.warning("Answer analysis failed; falling back to mock analysis",
+                            extra={"agent": self.agent, "error": str(e)})
+        llm_fallbacks.inc(agent=self.agent)
+        return get_mock_analysis(answer_text, expected_key_points)
+
+    async def stream_single_answer(
+        self,
+        question_text: str,
+        answer_text: str,
+        expected_key_points: List[str],
+        skill_tested: str,
+        difficulty: str
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Streaming variant of analyze_single_answer
+        Yields ("token", text) as the model writes, then exactly one ("analysis", dict)
+        """
+        
+        if DEVELOPMENT_MODE:
+            async for event in stream_mock_analysis(answer_text, expected_key_points):
+                yield event
+            return
+        
+        cache_key = self._cache_key(question_text, answer_text, expected_key_points, skill_tested, difficulty)
+        cached = await response_cache.get(cache_key)
+        if cached is not None:
+            yield ("analysis", cached)
+            return
+        
+        prompt = self._build_prompt(question_text, answer_text, expected_key_points, skill_tested, difficulty)
+        
+        # Parse as the tokens arrive instead of rescanning the full text at the end
+        extractor = JsonExtractor()
+        chunks = []
+        analysis = None
+        try:
+            async for text in llm_limiter.stream(self.model, prompt, agent=self.agent):
+                extractor.feed(text)
+                chunks.append(text)
+                yield ("token", text)
+        except Exception as e:
+            llm_log.warning("Answer analysis stream failed", extra={"agent": self.agent, "error": str(e)})
+        
+        # A cut-off stream may still be repairable
+        with span("json.extract", agent=self.agent, chars=sum(len(c) for c in chunks)):
+            parsed = extractor.finish()
+        if parsed is None:
+            json_parse_failures.inc(agent=self.agent)
+        try:
+            analysis = await validated_model_output(
+                self.model, prompt, "".join(chunks), parsed,
+                lambda parsed: validate_output(AnswerAnalysis, parsed), self.agent
+            )
+        except Exception as e:
+            llm_log.warning("Answer analysis failed", extra={"agent": self.agent, "error": str(e)})
+        
+        if analysis is not None:
+            await response_cache.set(cache_key, analysis)
+            yield ("analysis", analysis)
+        else:
+            llm_log.warning("Falling back to mock analysis", extra={"agent": self.agent})
+            llm_fallbacks.inc(agent=self.agent)
+            yield ("analysis", get_mock_analysis(answer_text, expected_key_points))
+
+
+async def stream_mock_analysis(answer_text: str,
+                               expected_key_points: Optional[List[str]]) -> AsyncIterator[Tuple[str, Any]]:
+    """Mock analysis in the streaming event shape: feedback words as tokens, then the analysis"""
+    analysis = get_mock_analysis(answer_text, expected_key_points)
+    for word in analysis["feedback_to_candidate"].split(" "):
+        yield ("token", word + " ")
+    yield ("analysis", analysis)
 
 # ============================================================
 # Agentic AI Report Generator
@@ -679,39 +1064,40 @@ class Agentic_ReportGenerator:
     
     def __init__(self, model_name="gemini-1.5-flash"):
         self.model_name = model_name
+        self.agent = type(self).__name__
         if not DEVELOPMENT_MODE:
-            self.model = genai.GenerativeModel(model_name)
+            self.model = model_provider.get_model(model_name)
     
-    def generate_comprehensive_report(
+    async def generate_comprehensive_report(
         self,
         candidate_name: str,
         role: str,
         experience: str,
         selected_skills: List[Dict],
-        interview_data: List[Dict],
+        stats: Dict[str, Any],
         individual_scores: Dict[str, float]
     ) -> Dict[str, Any]:
         """
         Agentic process: Generate comprehensive evaluation report
-        Synthesizes performance across all questions
+        Synthesizes performance across all questions from the running answer statistics
         """
         
+        answers_count = stats.get("answers", 0)
         if DEVELOPMENT_MODE:
-            print(f"🔧 Development mode: Using DYNAMIC mock report with actual scores")
-            return get_mock_report(candidate_name, role, len(interview_data), 
-                                 interview_data=interview_data,
-                                 individual_scores=individual_scores)
-        
-        # Prepare interview summary
-        interview_summary = []
-        for idx, qa in enumerate(interview_data, 1):
-            interview_summary.append(
-                f"Q{idx}: {qa.get('question_text', 'N/A')}\n"
-                f"Answer: {qa.get('answer_text', 'N/A')[:200]}...\n"
-                f"Score: {qa.get('overall_score', 0)}/100\n"
-            )
-        
-        summary_text = "\n".join(interview_summary)
+            llm_log.debug("Development mode: using mock report built from the actual scores")
+            return get_mock_report(candidate_name, role, answers_count,
+                                 individual_scores=individual_scores,
+                                 stats=stats)
+        
+        # Pre-aggregated statistics instead of the full transcript
+        summary = summarize(stats)
+        summary_text = (
+            f"Questions answered: {summary['answers']}\n"
+            f"Average answer score: {summary['average_score']}/100\n"
+            f"Average score per skill: {json.dumps(summary['skills'])}\n"
+            f"Average quality ratings (0-100): {json.dumps(summary['quality'])}\n"
+            f"Answer score histogram (bucket lower bound -> answers): {json.dumps(summary['histogram'])}"
+        )
         skills_str = ", ".join([s.get('skill_name', '') for s in selected_skills])
         
         prompt = f"""You are a senior technical hiring manager reviewing an interview.
@@ -721,7 +1107,7 @@ ROLE: {role}
 EXPERIENCE: {experience}
 SKILLS ASSESSED: {skills_str}
 
-INTERVIEW SUMMARY:
+INTERVIEW STATISTICS:
 {summary_text}
 
 SKILL SCORES:
@@ -745,57 +1131,307 @@ Return ONLY valid JSON (no markdown):
 }}"""
         
         try:
-            response_text = call_model_safe(self.model, prompt)
-            parsed = safe_parse_json_from_model(response_text)
-            if parsed and isinstance(parsed, dict):
-                return parsed
-            try:
-                return json.loads(response_text)
-            except Exception:
-                print("⚠️  Could not parse model JSON for report; falling back to dynamic mock report")
-                return get_mock_report(candidate_name, role, len(interview_data),
-                                     interview_data=interview_data,
-                                     individual_scores=individual_scores)
+            report = await call_model_structured(
+                self.model, prompt, lambda parsed: validate_output(InterviewReport, parsed), self.agent
+            )
+            if report is not None:
+                return report
+            llm_log.warning("No valid report from the model; falling back to mock report",
+                            extra={"agent": self.agent})
         except Exception as e:
-            print(f"❌ Error generating report: {e}")
-            print("🔧 Falling back to dynamic mock report")
-            return get_mock_report(candidate_name, role, len(interview_data),
-                                 interview_data=interview_data,
-                                 individual_scores=individual_scores)
+            llm_log.warning("Report generation failed; falling back to mock report",
+                            extra={"agent": self.agent, "error": str(e)})
+        llm_fallbacks.inc(agent=self.agent)
+        return get_mock_report(candidate_name, role, answers_count,
+                               individual_scores=individual_scores,
+                               stats=stats)
 
 # Initialize AI components
 question_generator = Agentic_QuestionGenerator()
 answer_analyzer = Agentic_AnswerAnalyzer()
 report_generator = Agentic_ReportGenerator()
 
+# ============================================================
+# Question Bank
+# ============================================================
+
+async def generate_bank_questions(role: str, skill: str, proficiency: str, difficulty: str, count: int,
+                                  exclude_questions: List[str]) -> List[Dict[str, Any]]:
+    """
+    Refill source for the question bank: mock templates in development mode, the generator otherwise.
+    The model is asked for this difficulty only, told which questions the pool already has and
+    bypasses the response cache, so every refill can add new questions.
+    """
+    skills = [{"skill_name": skill, "proficiency_level": proficiency}]
+    if DEVELOPMENT_MODE:
+        # Every template for the skill, keeping those the mock set grades at this difficulty
+        return [q for q in get_mock_questions(role, skills, total=20) if q["difficulty"] == difficulty]
+    generated = await question_generator.generate_initial_questions(
+        candidate_name="Candidate",
+        role=role,
+        experience=proficiency,
+        selected_skills=skills,
+        total_questions=count,
+        difficulty=difficulty,
+        exclude_questions=exclude_questions,
+        use_cache=False,
+        # The bank only wants model questions; the next refill tops the pool up
+        fill_missing=False
+    )
+    # Questions the model graded at another difficulty are dropped by the bank
+    return generated
+
+
+question_bank = QuestionBank(get_database, generate_bank_questions)
+
+# ============================================================
+# Background Report Generation
+# ============================================================
+
+def interview_stats(interview: Dict[str, Any]) -> Dict[str, Any]:
+    """Running answer totals (rebuilt once for interviews that predate them)"""
+    return interview.get(STATS_FIELD) or stats_from_answers(interview.get("answers", []))
+
+
+async def run_report_job(interview_id: str) -> Dict[str, Any]:
+    """Worker body; runs outside any request, so each job gets its own trace"""
+    with start_trace("report", interview_id=interview_id):
+        return await build_and_store_report(interview_id)
+
+
+async def build_and_store_report(interview_id: str) -> Dict[str, Any]:
+    """
+    Generate and persist the final report for one interview.
+    Moves report_status pending -> running -> done (or failed).
+    """
+    repos = await get_repositories()
+
+    try:
+        # Refresh the claim so other workers don't take over a report that is making progress
+        await repos.interviews.set_report_status(interview_id, REPORT_RUNNING,
+                                                 {REPORT_CLAIMED_AT_FIELD: datetime.utcnow()})
+        interview = await repos.interviews.get(interview_id)
+        if interview is None:
+            raise KeyError(f"Interview {interview_id} not found")
+
+        api_log.info("Generating final report", extra={"interview_id": interview_id})
+        answers = interview.get("answers", [])
+        with span("report.build"):
+            report = await report_generator.generate_comprehensive_report(
+                candidate_name=interview.get("candidate_name", "Candidate"),
+                role=interview.get("role", ""),
+                experience=interview.get("experience", ""),
+                selected_skills=interview.get("selected_skills", []),
+                stats=interview_stats(interview),
+                individual_scores=interview.get("skill_scores", {})
+            )
+
+        # Persist report into evaluations collection and update interview
+        report_doc = {
+            "interview_id": interview_id,
+            "candidate_name": interview.get("candidate_name"),
+            "role": interview.get("role"),
+            "experience": interview.get("experience"),
+            "selected_skills": interview.get("selected_skills"),
+            "report": report,
+            "generated_at": datetime.utcnow(),
+            "skill_scores": interview.get("skill_scores", {}),
+            "answers": answers  # Include all Q&A for the report
+        }
+        await repos.evaluations.save(report_doc)
+        await repos.interviews.set_report_status(
+            interview_id,
+            REPORT_DONE,
+            {
+                "evaluation_id": str(uuid.uuid4()),
+                "final_recommendation": report.get("recommendation", "maybe"),
+                "overall_score": report.get("overall_score", 0),
+                "final_report": report
+            }
+        )
+    except Exception:
+        try:
+            await repos.interviews.set_report_status(interview_id, REPORT_FAILED)
+        except Exception:
+            pass
+        raise
+
+    api_log.info("Report generated", extra={"interview_id": interview_id,
+                                           "recommendation": report.get("recommendation")})
+    return report
+
+
+report_jobs = ReportJobQueue(run_report_job)
+
+
+async def enqueue_report_generation(interview_id: str, repos: Storage) -> Optional[asyncio.Future]:
+    """
+    Queue final report generation unless it is already pending, running or done.
+    Returns the in-flight job future (None if the report was already generated
+    or is being generated by another process).
+    """
+    if await repos.interviews.claim_report_job(interview_id):
+        return report_jobs.enqueue(interview_id)
+    return report_jobs.get(interview_id)
+
+
+async def wait_for_report(interview_id: str, job: Optional[asyncio.Future],
+                          repos: Storage) -> Optional[Dict[str, Any]]:
+    """
+    The final report once it exists: awaits the local job, or polls the shared
+    interview document while another worker generates it (taking the job over
+    if that worker's claim goes stale). None if generation failed.
+    """
+    while True:
+        if job is not None:
+            try:
+                return await asyncio.shield(job)
+            except Exception:
+                # Already logged by the job queue; report_status is now failed
+                return None
+        interview = await repos.interviews.get(interview_id, {"_id": 0, "report_status": 1, "final_report": 1})
+        if interview is None or interview.get("report_status") == REPORT_FAILED:
+            return None
+        if interview.get("final_report"):
+            return interview["final_report"]
+        await asyncio.sleep(REPORT_POLL_INTERVAL_SECONDS)
+        job = await enqueue_report_generation(interview_id, repos)
+
+def build_question_doc(interview_id: str, q: Dict[str, Any]) -> Dict[str, Any]:
+    """Generated question -> stored question document"""
+    return {
+        "interview_id": interview_id,
+        "question_id": q["id"],
+        "number": q["number"],
+        "text": q["question"],
+        "skill_tested": q["skill_tested"],
+        "difficulty": q["difficulty"],
+        "expected_key_points": q.get("expected_key_points", []),
+        "why_this_question": q.get("why_this_question", ""),
+        "follow_up_prompt": q.get("follow_up_prompt", "")
+    }
+
+
+# ============================================================
+# Streaming Question Generation
+# ============================================================
+
+# Keep references so in-flight generation tasks aren't garbage collected
+question_stream_tasks: Set[asyncio.Task] = set()
+# interview_id -> event set whenever a new question is stored (this process only)
+question_arrivals: Dict[str, asyncio.Event] = {}
+
+
+def notify_question_arrival(interview_id: str):
+    event = question_arrivals.get(interview_id)
+    if event is not None:
+        event.set()
+        question_arrivals[interview_id] = asyncio.Event()
+
+
+async def wait_for_question_arrival(interview_id: str, timeout: float):
+    """Sleep until the next question is stored or the poll interval passes"""
+    event = question_arrivals.get(interview_id)
+    timeout = min(timeout, QUESTION_POLL_INTERVAL_SECONDS)
+    if event is None:
+        # Generated by another process (or already finished): poll
+        await asyncio.sleep(timeout)
+        return
+    try:
+        await asyncio.wait_for(event.wait(), timeout=timeout)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def stream_questions_into_interview(interview_id: str, request: InterviewSetupRequest,
+                                          skills_list: List[Dict[str, Any]]):
+    """Background task: persist each question as soon as the model finishes writing it"""
+    # Outlives the create request; exported as its own trace under the same trace id
+    with start_trace("question-stream", trace_id=current_trace_id(), interview_id=interview_id):
+        await store_streamed_questions(interview_id, request, skills_list)
+
+
+async def store_streamed_questions(interview_id: str, request: InterviewSetupRequest,
+                                   skills_list: List[Dict[str, Any]]):
+    repos = await get_repositories()
+    count = 0
+    seen_ids = set()
+    try:
+        async for q in question_generator.stream_initial_questions(
+            candidate_name=request.candidate_name,
+            role=request.role,
+            experience=request.experience,
+            selected_skills=skills_list,
+            total_questions=QUESTIONS_PER_INTERVIEW
+        ):
+            count += 1
+            # Number by arrival order; ids must stay unique within the interview
+            question_id = q.get("id") or f"q_{count}"
+            if question_id in seen_ids:
+                question_id = f"{question_id}_{count}"
+            seen_ids.add(question_id)
+            q = {"skill_tested": "General", "difficulty": "medium", **q, "id": question_id, "number": count}
+
+            await repos.questions.insert_many([build_question_doc(interview_id, q)])
+            notify_question_arrival(interview_id)
+    except Exception as e:
+        api_log.error("Streaming questions failed", extra={"interview_id": interview_id, "error": str(e)})
+    finally:
+        await repos.interviews.set_fields(interview_id, {"questions_status": "ready", "total_questions": count})
+        notify_question_arrival(interview_id)
+        question_arrivals.pop(interview_id, None)
+        api_log.info("Questions streamed", extra={"interview_id": interview_id, "questions": count})
+
+
+def start_question_stream(interview_id: str, request: InterviewSetupRequest,
+                          skills_list: List[Dict[str, Any]]):
+    question_arrivals[interview_id] = asyncio.Event()
+    task = asyncio.create_task(stream_questions_into_interview(interview_id, request, skills_list))
+    question_stream_tasks.add(task)
+    task.add_done_callback(question_stream_tasks.discard)
+
+
 # ============================================================
 # API Endpoints
 # ============================================================
 
 @app.post("/api/interviews/create")
-async def create_interview(request: InterviewSetupRequest):
+async def create_interview(request: InterviewSetupRequest,
+                           idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)):
     """
     Create new interview session
     Agentic: Generates personalized questions based on role and skills
+    With stream_questions, returns immediately and questions are generated in the background
+    A retry with the same Idempotency-Key replays the first response instead of creating another interview
     """
+    repos = await get_repositories()
+    return await run_idempotent(repos.idempotency, "create", idempotency_key, request,
+                                lambda: create_new_interview(request, repos))
+
+
+async def create_new_interview(request: InterviewSetupRequest, repos: Storage) -> Dict[str, Any]:
     try:
-        db = get_database()
-        
         # Generate unique interview ID
         interview_id = str(uuid.uuid4())
         
         # Convert Pydantic models to dicts
         skills_list = [skill.model_dump() for skill in request.selected_skills]
         
-        # Generate questions using agentic AI
-        print(f"🤖 Generating questions for {request.candidate_name}...")
-        questions = question_generator.generate_initial_questions(
-            candidate_name=request.candidate_name,
-            role=request.role,
-            experience=request.experience,
-            selected_skills=skills_list,
-            total_questions=8
-        )
+        # Assemble from the pre-generated bank; generate live only if a pool is short
+        questions = await question_bank.assemble(request.role, skills_list, total_questions=QUESTIONS_PER_INTERVIEW)
+        streaming = questions is None and request.stream_questions
+        if questions is None and not streaming:
+            # Generate questions using agentic AI
+            api_log.debug("Generating questions", extra={"interview_id": interview_id})
+            questions = await question_generator.generate_initial_questions(
+                candidate_name=request.candidate_name,
+                role=request.role,
+                experience=request.experience,
+                selected_skills=skills_list,
+                total_questions=QUESTIONS_PER_INTERVIEW
+            )
+        if streaming:
+            questions = []
         
         # Create interview record
         interview_doc = {
@@ -804,8 +1440,12 @@ async def create_interview(request: InterviewSetupRequest):
             "role": request.role,
             "experience": request.experience,
             "selected_skills": skills_list,
-            "total_questions": len(questions),
+            "total_questions": QUESTIONS_PER_INTERVIEW if streaming else len(questions),
+            # "generating" while questions are still being streamed in
+            "questions_status": "generating" if streaming else "ready",
             "current_question": 0,
+            # Bumped on every progression update (optimistic concurrency across workers)
+            "version": 0,
             "status": "in_progress",
             "created_at": datetime.utcnow(),
             "answers": [],
@@ -815,462 +1455,373 @@ async def create_interview(request: InterviewSetupRequest):
             "evaluations": [],
             # Final aggregated report (populated after all questions answered)
             "final_report": None,
-            "skill_scores": {}
+            "skill_scores": {},
+            # Running totals, updated with $inc on every answer (see aggregates.py)
+            STATS_FIELD: {}
         }
+        question_docs = [build_question_doc(interview_id, q) for q in questions]
         
-        # Store in database (if available) or in DEV_STORE when in development mode
-        if db is not None:
-            db[COLLECTION_INTERVIEWS].insert_one(interview_doc)
-
-            # Remove any existing questions for this interview_id to avoid duplicates
-            try:
-                db[COLLECTION_QUESTIONS].delete_many({"interview_id": interview_id})
-            except Exception:
-                pass
-
-            # Store questions
-            for q in questions:
-                question_doc = {
-                    "interview_id": interview_id,
-                    "question_id": q["id"],
-                    "number": q["number"],
-                    "text": q["question"],
-                    "skill_tested": q["skill_tested"],
-                    "difficulty": q["difficulty"],
-                    "expected_key_points": q.get("expected_key_points", []),
-                    "why_this_question": q.get("why_this_question", ""),
-                    "follow_up_prompt": q.get("follow_up_prompt", "")
-                }
-                db[COLLECTION_QUESTIONS].insert_one(question_doc)
-        else:
-            # Development mode: persist into DEV_STORE so subsequent endpoints can use them
-            DEV_STORE["interviews"][interview_id] = interview_doc
-            stored_qs = []
-            for q in questions:
-                stored_qs.append({
-                    "interview_id": interview_id,
-                    "question_id": q["id"],
-                    "number": q["number"],
-                    "text": q["question"],
-                    "skill_tested": q["skill_tested"],
-                    "difficulty": q["difficulty"],
-                    "expected_key_points": q.get("expected_key_points", []),
-                    "why_this_question": q.get("why_this_question", ""),
-                    "follow_up_prompt": q.get("follow_up_prompt", "")
-                })
-            DEV_STORE["questions"][interview_id] = stored_qs
+        # Store in MongoDB, or the in-memory store in development mode
+        await repos.interviews.create(interview_doc)
+        await repos.questions.insert_many(question_docs)
+        
+        if streaming:
+            api_log.debug("Streaming questions", extra={"interview_id": interview_id})
+            start_question_stream(interview_id, request, skills_list)
+            return {
+                "success": True,
+                "interview_id": interview_id,
+                "total_questions": QUESTIONS_PER_INTERVIEW,
+                "questions_status": "generating",
+                "message": f"Generating {QUESTIONS_PER_INTERVIEW} personalized questions"
+            }
         
-        print(f"✅ Interview created: {interview_id}")
+        api_log.info("Interview created", extra={"interview_id": interview_id})
         
         return {
             "success": True,
             "interview_id": interview_id,
             "total_questions": len(questions),
+            "questions_status": "ready",
             "message": f"Generated {len(questions)} personalized questions"
         }
     
     except Exception as e:
-        print(f"❌ Error creating interview: {e}")
+        api_log.exception("Error creating interview")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def completed_response(question_number: int, total_questions: int) -> NextQuestionResponse:
+    return NextQuestionResponse(
+        question_id="",
+        question_number=question_number,
+        total_questions=total_questions,
+        question_text="",
+        skill_being_tested="",
+        difficulty_level="",
+        completed=True
+    )
+
+
+def pick_next_question(interview: Dict[str, Any], questions: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    The question already served but not answered yet, if any (so a repeated
+    next-question returns the same question instead of skipping ahead);
+    otherwise the next question numbered after current_question that hasn't been asked
+    """
+    current_q_num = interview.get("current_question", 0)
+    total_questions = interview.get("total_questions", len(questions))
+    current_question_id = interview.get("current_question_id")
+    if current_question_id:
+        for q in questions:
+            # Answers are taken in order, so a marker at or below current_question is stale
+            if q.get("question_id") == current_question_id and q.get("number", 0) > current_q_num:
+                return q
+    # Skip any questions that were already marked as asked
+    asked_ids = set(interview.get("asked_question_ids", []) or [])
+    for q in questions:
+        if q.get("number", 0) <= current_q_num or q.get("number", 0) > total_questions:
+            continue
+        if q.get("question_id") in asked_ids:
+            continue
+        return q
+    return None
+
+
 @app.get("/api/interviews/{interview_id}/next-question")
 async def get_next_question(interview_id: str):
     """
     Get next question in the interview
     Returns question or completion status
+    While questions are still streaming in, waits briefly for the next one to arrive
     """
     try:
-        db = get_database()
+        repos = await get_repositories()
+        deadline = asyncio.get_running_loop().time() + QUESTION_WAIT_TIMEOUT_SECONDS
         
-        if db is None:
-            # Development mode: pull from in-memory DEV_STORE
-            interview = DEV_STORE["interviews"].get(interview_id)
-            questions = DEV_STORE["questions"].get(interview_id, [])
-            if not interview or not questions:
-                # no interview found in dev store
-                return NextQuestionResponse(
-                    question_id="",
-                    question_number=0,
-                    total_questions=0,
-                    question_text="",
-                    skill_being_tested="",
-                    difficulty_level="",
-                    completed=True
-                )
-
+        while True:
+            # Get interview
+            interview = await repos.interviews.get(interview_id, {"answers": 0, "evaluations": 0})
+            
+            if not interview:
+                raise HTTPException(status_code=404, detail="Interview not found")
+            
+            # Fetch the whole question set once
+            questions = await repos.questions.list_for_interview(interview_id)
+            
             current_q_num = interview.get("current_question", 0)
             total_questions = interview.get("total_questions", len(questions))
-
+            
+            # Check if completed
             if current_q_num >= total_questions:
-                return NextQuestionResponse(
-                    question_id="",
-                    question_number=current_q_num,
-                    total_questions=total_questions,
-                    question_text="",
-                    skill_being_tested="",
-                    difficulty_level="",
-                    completed=True
-                )
-
-            # Skip any questions that were already marked as asked
-            asked_ids = interview.get("asked_question_ids", []) or []
-            q = None
-            for idx in range(current_q_num, len(questions)):
-                candidate = questions[idx]
-                if candidate.get("question_id") not in asked_ids:
-                    q = candidate
+                return completed_response(current_q_num, total_questions)
+            
+            question = pick_next_question(interview, questions)
+            if question is not None:
+                if question.get("question_id") == interview.get("current_question_id"):
+                    break
+                # Compare-and-set on the version read above; if a concurrent request
+                # (double click, retry, another worker) moved progress first, re-read
+                if await repos.interviews.mark_question_asked(
+                        interview_id, question.get("question_id"), interview.get("version", 0)):
                     break
-
-            if q is None:
-                return NextQuestionResponse(
-                    question_id="",
-                    question_number=current_q_num,
-                    total_questions=total_questions,
-                    question_text="",
-                    skill_being_tested="",
-                    difficulty_level="",
-                    completed=True
-                )
-
-            # Mark this question as asked in the dev store
-            if q.get("question_id") not in interview.get("asked_question_ids", []):
-                interview.setdefault("asked_question_ids", []).append(q.get("question_id"))
-
-            return NextQuestionResponse(
-                question_id=q["question_id"],
-                question_number=q["number"],
-                total_questions=total_questions,
-                question_text=q["text"],
-                skill_being_tested=q.get("skill_tested", ""),
-                difficulty_level=q.get("difficulty", ""),
-                completed=False
-            )
-        
-        # Get interview
-        interview = db[COLLECTION_INTERVIEWS].find_one(
-            {"interview_id": interview_id}
-        )
-        
-        if not interview:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        current_q_num = interview["current_question"]
-        total_questions = interview["total_questions"]
-        
-        # Check if completed
-        if current_q_num >= total_questions:
-            return NextQuestionResponse(
-                question_id="",
-                question_number=current_q_num,
-                total_questions=total_questions,
-                question_text="",
-                skill_being_tested="",
-                difficulty_level="",
-                completed=True
-            )
-        
-        # Get next question, skipping IDs already asked
-        asked_ids = interview.get("asked_question_ids", []) or []
-
-        # Try to find next question number > current_q_num that isn't asked yet
-        question = None
-        for num in range(current_q_num + 1, total_questions + 1):
-            q = db[COLLECTION_QUESTIONS].find_one({
-                "interview_id": interview_id,
-                "number": num
-            })
-            if not q:
-                continue
-            if q.get("question_id") in asked_ids:
                 continue
-            question = q
-            break
-
-        if not question:
-            # No unasked questions remain
-            return NextQuestionResponse(
-                question_id="",
-                question_number=current_q_num,
-                total_questions=total_questions,
-                question_text="",
-                skill_being_tested="",
-                difficulty_level="",
-                completed=True
-            )
-
-        # Mark as asked
-        try:
-            db[COLLECTION_INTERVIEWS].update_one(
-                {"interview_id": interview_id},
-                {"$addToSet": {"asked_question_ids": question.get("question_id")}}
-            )
-        except Exception:
-            pass
+            
+            if interview.get("questions_status") != "generating":
+                # No unasked questions remain
+                return completed_response(current_q_num, total_questions)
+            
+            # Candidate outran generation: wait for the next question to be stored
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise HTTPException(
+                    status_code=503,
+                    detail="Next question is still being generated, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            await wait_for_question_arrival(interview_id, remaining)
 
         return NextQuestionResponse(
             question_id=question["question_id"],
             question_number=question["number"],
             total_questions=total_questions,
             question_text=question["text"],
-            skill_being_tested=question["skill_tested"],
-            difficulty_level=question["difficulty"],
+            skill_being_tested=question.get("skill_tested", ""),
+            difficulty_level=question.get("difficulty", ""),
             completed=False
         )
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting next question: {e}")
+        api_log.exception("Error getting next question")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/interviews/{interview_id}/submit-answer")
-async def submit_answer(interview_id: str, request: SubmitAnswerRequest):
+async def claim_question_for_answer(interview_id: str, question_id: str,
+                                    repos: Storage) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
     """
-    Submit answer to current question
-    Agentic: AI analyzes answer quality and provides feedback
+    Submits are idempotent per (interview_id, question_id). Returns:
+    - (question, None) once this request holds the claim to analyze the answer
+    - (None, answer_record) if the question was already answered, for replay
+    Raises 404 for an unknown interview or question, 409 (no Retry-After) for a
+    question that isn't the one being served, and 409 with Retry-After while
+    another request (a double click, a retry, another worker) is analyzing the
+    same answer, so duplicate submits never pay for a second model call.
     """
+    question = None
+    for _ in range(ANSWER_CLAIM_ATTEMPTS):
+        state = await repos.interviews.get_answer_state(interview_id, question_id)
+        if state is None:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        if state["answer"] is not None:
+            if state["current_question_id"] == question_id:
+                # Stale marker on an answered question: clear it so next-question moves on
+                await repos.interviews.compare_and_set(
+                    interview_id, state["version"], {"$unset": {"current_question_id": ""}})
+            return None, state["answer"]
+
+        if question is None:
+            question = await repos.questions.get_by_id(interview_id, question_id)
+            if not question:
+                raise HTTPException(status_code=404, detail="Question not found")
+        if state["current_question_id"] != question_id:
+            # Only the question served by next-question can be answered; anything
+            # else would skip questions
+            raise HTTPException(status_code=409, detail="Question is not the current question")
+
+        now = datetime.utcnow()
+        claimed_at = state["claimed_at"]
+        if claimed_at is not None and (now - claimed_at).total_seconds() < ANSWER_CLAIM_TTL_SECONDS:
+            break
+        if await repos.interviews.compare_and_set(
+                interview_id, state["version"], {"$set": {answer_claim_path(question_id): now}}):
+            return question, None
+
+    raise HTTPException(
+        status_code=409,
+        detail="This answer is already being analyzed, please retry",
+        headers={"Retry-After": "1"}
+    )
+
+
+async def persist_answer(interview_id: str, request: SubmitAnswerRequest,
+                         question: Dict[str, Any], analysis: Dict[str, Any], repos: Storage):
+    """Store the analyzed answer and queue the final report once every question is answered"""
+    # FIXED: store answer record with complete analysis data at top level
+    answer_record = {
+        "interview_id": interview_id,
+        "question_id": request.question_id,
+        "question_number": question.get("number", 0),
+        "question_text": question.get("text", ""),
+        "skill_tested": question.get("skill_tested", "General"),
+        "answer_text": request.answer,
+        "overall_score": analysis.get("overall_score", 0),  # TOP LEVEL for easy access
+        "communication_quality": analysis.get("communication_quality", "adequate"),
+        "technical_accuracy": analysis.get("technical_accuracy", "adequate"),
+        "depth_of_knowledge": analysis.get("depth_of_knowledge", "adequate"),
+        "analysis": analysis,  # Keep full analysis too
+        "time_taken_seconds": request.time_taken_seconds,
+        "submitted_at": datetime.utcnow()
+    }
+
+    increments = answer_increments(answer_record["skill_tested"], analysis)
+    skill_name = answer_record["skill_tested"]
+    skill_score = analysis.get("overall_score", 50)
+
+    # Single round trip: answer, evaluation, progress, skill score and running totals
+    progress = await repos.interviews.record_answer(
+        interview_id, answer_record, analysis, skill_name, skill_score, increments
+    )
+    if progress is None:
+        if await repos.interviews.get(interview_id, {"_id": 1}) is None:
+            raise HTTPException(status_code=404, detail="Interview not found")
+        # Another request (possibly on another worker) stored this answer first
+        raise HTTPException(status_code=409, detail="Question already answered")
+
+    total_q = progress.get("total_questions", 0)
+    if progress.get("evaluations_count", 0) >= total_q and total_q > 0:
+        # Final report is generated off the request path
+        try:
+            await enqueue_report_generation(interview_id, repos)
+        except Exception as e:
+            api_log.warning("Could not queue report generation", extra={"interview_id": interview_id, "error": str(e)})
+
+    api_log.debug("Answer stored", extra={"interview_id": interview_id, "score": skill_score})
+
+
+async def release_claim(interview_id: str, question_id: str, repos: Storage):
+    """Give up a claim after a failed submit so the client can retry"""
     try:
-        db = get_database()
-        
-        if db is None:
-            # Development mode: update DEV_STORE and return mock analysis
-            interview = DEV_STORE["interviews"].get(interview_id)
-            questions = DEV_STORE["questions"].get(interview_id, [])
-
-            # Find question in dev store to extract expected key points
-            q = None
-            for qq in questions:
-                if qq.get("question_id") == request.question_id:
-                    q = qq
-                    break
+        await repos.interviews.release_answer_claim(interview_id, question_id)
+    except Exception as e:
+        api_log.warning("Could not release answer claim", extra={"interview_id": interview_id, "error": str(e)})
 
-            expected_kp = q.get("expected_key_points") if q else None
-            analysis = get_mock_analysis(request.answer, expected_kp)
 
-            # FIXED: store answer record with complete analysis data at top level
-            answer_record = {
-                "interview_id": interview_id,
-                "question_id": request.question_id,
-                "question_number": q.get("number") if q else 0,
-                "question_text": q.get("text") if q else "",
-                "answer_text": request.answer,
-                "overall_score": analysis.get("overall_score", 0),  # TOP LEVEL for easy access
-                "communication_quality": analysis.get("communication_quality", "adequate"),
-                "technical_accuracy": analysis.get("technical_accuracy", "adequate"),
-                "depth_of_knowledge": analysis.get("depth_of_knowledge", "adequate"),
-                "analysis": analysis,  # Keep full analysis too
-                "time_taken_seconds": request.time_taken_seconds,
-                "submitted_at": datetime.utcnow()
-            }
+def answer_response(request: SubmitAnswerRequest, analysis: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "success": True,
+        "question_id": request.question_id,
+        "analysis": analysis,
+        "feedback": analysis.get("feedback_to_candidate", "Good answer!")
+    }
 
-            if interview is None:
-                # create minimal interview doc in dev store
-                interview = interview_doc = {
-                    "interview_id": interview_id,
-                    "candidate_name": "Dev Candidate",
-                    "role": "Developer",
-                    "experience": "mid",
-                    "selected_skills": [],
-                    "total_questions": len(questions),
-                    "current_question": 0,
-                    "status": "in_progress",
-                    "created_at": datetime.utcnow(),
-                    "answers": [],
-                    "skill_scores": {}
-                }
-                DEV_STORE["interviews"][interview_id] = interview
-
-            interview = DEV_STORE["interviews"][interview_id]
-            interview.setdefault("answers", []).append(answer_record)
-            interview["current_question"] = interview.get("current_question", 0) + 1
-
-            # Save structured evaluation for this answer
-            interview.setdefault("evaluations", []).append(analysis)
-
-            # Update skill score
-            if q:
-                skill_name = q.get("skill_tested", "General")
-                skill_score = analysis.get("overall_score", 50)
-                interview.setdefault("skill_scores", {})[skill_name] = skill_score
-
-            # If we've reached the total number of questions, generate final report
-            if len(interview.get("evaluations", [])) >= interview.get("total_questions", 0):
-                # FIXED: Pass complete answer data with all quality metrics
-                interview_data = []
-                for a in interview.get("answers", []):
-                    interview_data.append({
-                        "question_text": a.get("question_text", ""),
-                        "answer_text": a.get("answer_text", ""),
-                        "overall_score": a.get("overall_score", 0),  # Direct access
-                        "communication_quality": a.get("communication_quality", "adequate"),
-                        "technical_accuracy": a.get("technical_accuracy", "adequate"),
-                        "depth_of_knowledge": a.get("depth_of_knowledge", "adequate")
-                    })
-                
-                report = report_generator.generate_comprehensive_report(
-                    candidate_name=interview.get("candidate_name", "Dev Candidate"),
-                    role=interview.get("role", "Developer"),
-                    experience=interview.get("experience", "mid"),
-                    selected_skills=interview.get("selected_skills", []),
-                    interview_data=interview_data,  # FIXED: Complete data
-                    individual_scores=interview.get("skill_scores", {})
-                )
-                interview["final_report"] = report
 
-            return {
-                "success": True,
-                "question_id": request.question_id,
-                "analysis": analysis,
-                "feedback": analysis.get("feedback_to_candidate", "Good answer!")
-            }
-        
-        # Get interview
-        interview = db[COLLECTION_INTERVIEWS].find_one(
-            {"interview_id": interview_id}
-        )
-        
-        if not interview:
-            raise HTTPException(status_code=404, detail="Interview not found")
-        
-        # Get question
-        question = db[COLLECTION_QUESTIONS].find_one({
-            "question_id": request.question_id
-        })
-        
-        if not question:
-            raise HTTPException(status_code=404, detail="Question not found")
-        
-        # Analyze answer using agentic AI
-        print(f"🤖 Analyzing answer for question {question['number']}...")
-        analysis = answer_analyzer.analyze_single_answer(
-            question_text=question["text"],
-            answer_text=request.answer,
-            expected_key_points=question.get("expected_key_points", []),
-            skill_tested=question["skill_tested"],
-            difficulty=question["difficulty"]
-        )
-        
-        # FIXED: Store answer with complete analysis data at top level
-        answer_record = {
-            "interview_id": interview_id,
-            "question_id": request.question_id,
-            "question_number": question["number"],
-            "question_text": question["text"],
-            "answer_text": request.answer,
-            "overall_score": analysis.get("overall_score", 0),  # TOP LEVEL
-            "communication_quality": analysis.get("communication_quality", "adequate"),
-            "technical_accuracy": analysis.get("technical_accuracy", "adequate"),
-            "depth_of_knowledge": analysis.get("depth_of_knowledge", "adequate"),
-            "analysis": analysis,  # Keep full analysis
-            "time_taken_seconds": request.time_taken_seconds,
-            "submitted_at": datetime.utcnow()
-        }
-        
-        db[COLLECTION_INTERVIEWS].update_one(
-            {"interview_id": interview_id},
-            {
-                "$push": {"answers": answer_record},
-                "$inc": {"current_question": 1}
-            }
-        )
-        
-        # Update skill scores
-        skill_name = question["skill_tested"]
-        skill_score = analysis.get("overall_score", 50)
-        
-        db[COLLECTION_INTERVIEWS].update_one(
-            {"interview_id": interview_id},
-            {
-                "$set": {
-                    f"skill_scores.{skill_name}": skill_score
-                }
-            }
-        )
+@app.post("/api/interviews/{interview_id}/submit-answer")
+async def submit_answer(interview_id: str, request: SubmitAnswerRequest,
+                        idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_HEADER)):
+    """
+    Submit answer to current question
+    Agentic: AI analyzes answer quality and provides feedback
+    Resubmitting an answered question replays the stored analysis; with an
+    Idempotency-Key, a retry replays the first response as-is
+    """
+    repos = await get_repositories()
+    return await run_idempotent(repos.idempotency, f"submit-answer:{interview_id}", idempotency_key, request,
+                                lambda: analyze_and_store_answer(interview_id, request, repos))
 
-        # Append structured evaluation to interview.evaluations
-        try:
-            db[COLLECTION_INTERVIEWS].update_one(
-                {"interview_id": interview_id},
-                {"$push": {"evaluations": analysis}}
-            )
-        except Exception:
-            pass
 
-        # Re-fetch interview to check if all evaluations are present
+async def analyze_and_store_answer(interview_id: str, request: SubmitAnswerRequest,
+                                   repos: Storage) -> Dict[str, Any]:
+    try:
+        question, answered = await claim_question_for_answer(interview_id, request.question_id, repos)
+        if answered is not None:
+            return answer_response(request, answered.get("analysis", {}))
+        
         try:
-            interview_after = db[COLLECTION_INTERVIEWS].find_one({"interview_id": interview_id})
-            evaluations_list = interview_after.get("evaluations", []) or []
-            total_q = interview_after.get("total_questions", 0)
-            if len(evaluations_list) >= total_q and total_q > 0:
-                # Generate final report now that all answers evaluated
-                print("🤖 Generating final report (all evaluations present)...")
-                answers = interview_after.get("answers", [])
-                # FIXED: Pass complete answer data with all quality metrics
-                interview_data = []
-                for a in answers:
-                    interview_data.append({
-                        "question_text": a.get("question_text", ""),
-                        "answer_text": a.get("answer_text", ""),
-                        "overall_score": a.get("overall_score", 0),  # Direct access
-                        "communication_quality": a.get("communication_quality", "adequate"),
-                        "technical_accuracy": a.get("technical_accuracy", "adequate"),
-                        "depth_of_knowledge": a.get("depth_of_knowledge", "adequate")
-                    })
-                
-                report = report_generator.generate_comprehensive_report(
-                    candidate_name=interview_after.get("candidate_name", "Candidate"),
-                    role=interview_after.get("role", ""),
-                    experience=interview_after.get("experience", ""),
-                    selected_skills=interview_after.get("selected_skills", []),
-                    interview_data=interview_data,  # FIXED: Complete data
-                    individual_scores=interview_after.get("skill_scores", {})
-                )
-
-                # Persist report into evaluations collection and update interview
-                report_doc = {
-                    "interview_id": interview_id,
-                    "candidate_name": interview_after.get("candidate_name"),
-                    "role": interview_after.get("role"),
-                    "experience": interview_after.get("experience"),
-                    "selected_skills": interview_after.get("selected_skills"),
-                    "report": report,
-                    "generated_at": datetime.utcnow(),
-                    "skill_scores": interview_after.get("skill_scores", {}),
-                    "answers": answers
-                }
-                try:
-                    db[COLLECTION_EVALUATIONS].insert_one(report_doc)
-                except Exception:
-                    pass
-
-                try:
-                    db[COLLECTION_INTERVIEWS].update_one(
-                        {"interview_id": interview_id},
-                        {"$set": {"final_report": report, "final_recommendation": report.get("recommendation", "maybe"), "overall_score": report.get("overall_score", 0)}}
-                    )
-                except Exception:
-                    pass
+            # Analyze answer using agentic AI (mock analysis in development mode)
+            api_log.debug("Analyzing answer", extra={"interview_id": interview_id, "question": question["number"]})
+            analysis = await answer_analyzer.analyze_single_answer(
+                question_text=question["text"],
+                answer_text=request.answer,
+                expected_key_points=question.get("expected_key_points", []),
+                skill_tested=question.get("skill_tested", "General"),
+                difficulty=question.get("difficulty", "medium")
+            )
+            
+            await persist_answer(interview_id, request, question, analysis, repos)
         except Exception:
-            pass
+            await release_claim(interview_id, request.question_id, repos)
+            raise
         
-        print(f"✅ Answer analyzed. Score: {skill_score}/100")
-        
-        return {
-            "success": True,
-            "question_id": request.question_id,
-            "analysis": analysis,
-            "feedback": analysis.get("feedback_to_candidate", "Good answer!")
-        }
+        return answer_response(request, analysis)
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error submitting answer: {e}")
+        api_log.exception("Error submitting answer")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@app.post("/api/interviews/{interview_id}/submit-answer/stream")
+async def submit_answer_stream(interview_id: str, request: SubmitAnswerRequest):
+    """
+    Streaming variant of submit-answer (Server-Sent Events)
+    Events: "token" ({"text"}) while the model writes feedback, then "analysis"
+    (same body as submit-answer, sent after the answer is persisted) and "done".
+    """
+    try:
+        repos = await get_repositories()
+        question, answered = await claim_question_for_answer(interview_id, request.question_id, repos)
+    except HTTPException:
+        raise
+    except Exception as e:
+        api_log.exception("Error submitting answer")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if answered is not None:
+        async def replay_stream():
+            yield sse_event("analysis", answer_response(request, answered.get("analysis", {})))
+            yield sse_event("done", {})
+
+        return StreamingResponse(
+            replay_stream(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    analysis_events = answer_analyzer.stream_single_answer(
+        question_text=question["text"],
+        answer_text=request.answer,
+        expected_key_points=question.get("expected_key_points", []),
+        skill_tested=question.get("skill_tested", "General"),
+        difficulty=question.get("difficulty", "medium")
+    )
+
+    async def event_stream():
+        analysis = None
+        stored = False
+        try:
+            async for kind, payload in analysis_events:
+                if kind == "token":
+                    yield sse_event("token", {"text": payload})
+                else:
+                    analysis = payload
+            await persist_answer(interview_id, request, question, analysis, repos)
+            stored = True
+            yield sse_event("analysis", answer_response(request, analysis))
+        except Exception as e:
+            api_log.exception("Error streaming answer analysis")
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            yield sse_event("error", {"detail": detail})
+        finally:
+            # Also on client disconnect (CancelledError), so a retry isn't locked out
+            if not stored:
+                await release_claim(interview_id, request.question_id, repos)
+        yield sse_event("done", {})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.post("/api/interviews/{interview_id}/complete")
 async def complete_interview(interview_id: str):
     """
@@ -1278,129 +1829,44 @@ async def complete_interview(interview_id: str):
     Agentic: Report synthesizes entire interview and makes hiring recommendation
     """
     try:
-        db = get_database()
-        
-        if db is None:
-            # Development mode: build report from DEV_STORE data
-            interview = DEV_STORE["interviews"].get(interview_id)
-            if not interview:
-                # Fallback report when no interview found
-                report = get_mock_report("Test Candidate", "Developer", 0, 
-                                       interview_data=[], 
-                                       individual_scores={})
-                return {"success": True, "interview_id": interview_id, "report": report}
-
-            answers = interview.get("answers", [])
-            # If a final_report already exists in the interview doc, return it
-            if interview.get("final_report"):
-                return {"success": True, "interview_id": interview_id, "report": interview.get("final_report")}
-
-            # FIXED: Pass complete answer data with all quality metrics
-            interview_data = []
-            for a in answers:
-                interview_data.append({
-                    "question_text": a.get("question_text", ""),
-                    "answer_text": a.get("answer_text", ""),
-                    "overall_score": a.get("overall_score", 0),  # Direct access
-                    "communication_quality": a.get("communication_quality", "adequate"),
-                    "technical_accuracy": a.get("technical_accuracy", "adequate"),
-                    "depth_of_knowledge": a.get("depth_of_knowledge", "adequate")
-                })
-
-            individual_scores = interview.get("skill_scores", {})
-
-            # Use the report generator (in dev mode this will call get_mock_report but now dynamic)
-            report = report_generator.generate_comprehensive_report(
-                candidate_name=interview.get("candidate_name", "Dev Candidate"),
-                role=interview.get("role", "Developer"),
-                experience=interview.get("experience", "mid"),
-                selected_skills=interview.get("selected_skills", []),
-                interview_data=interview_data,  # FIXED: Complete data
-                individual_scores=individual_scores
-            )
-
-            return {"success": True, "interview_id": interview_id, "report": report}
+        repos = await get_repositories()
         
         # Get interview
-        interview = db[COLLECTION_INTERVIEWS].find_one({"interview_id": interview_id})
+        interview = await repos.interviews.get(interview_id, {"answers": 0})
 
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found")
 
         # If final_report already exists, return it
         if interview.get("final_report"):
-            return {"success": True, "interview_id": interview_id, "report": interview.get("final_report")}
+            return {"success": True, "interview_id": interview_id, "report": interview.get("final_report"),
+                    "report_status": REPORT_DONE}
 
         # Mark as completed
-        db[COLLECTION_INTERVIEWS].update_one({"interview_id": interview_id}, {"$set": {"status": "completed"}})
-
-        # Prepare interview data for report
-        answers = interview.get("answers", [])
-        # FIXED: Pass complete answer data with all quality metrics
-        interview_data = []
-        for a in answers:
-            interview_data.append({
-                "question_text": a.get("question_text", ""),
-                "answer_text": a.get("answer_text", ""),
-                "overall_score": a.get("overall_score", 0),  # Direct access
-                "communication_quality": a.get("communication_quality", "adequate"),
-                "technical_accuracy": a.get("technical_accuracy", "adequate"),
-                "depth_of_knowledge": a.get("depth_of_knowledge", "adequate")
-            })
-
-        # Generate comprehensive report using agentic AI
-        print(f"🤖 Generating comprehensive report...")
-        report = report_generator.generate_comprehensive_report(
-            candidate_name=interview["candidate_name"],
-            role=interview["role"],
-            experience=interview["experience"],
-            selected_skills=interview["selected_skills"],
-            interview_data=interview_data,  # FIXED: Complete data
-            individual_scores=interview.get("skill_scores", {})
-        )
+        await repos.interviews.set_fields(interview_id, {"status": "completed"})
 
-        # Store report
-        report_doc = {
-            "interview_id": interview_id,
-            "candidate_name": interview["candidate_name"],
-            "role": interview["role"],
-            "experience": interview["experience"],
-            "selected_skills": interview["selected_skills"],
-            "report": report,
-            "generated_at": datetime.utcnow(),
-            "skill_scores": interview.get("skill_scores", {}),
-            "answers": answers  # Include all Q&A for the report
-        }
-
-        try:
-            db[COLLECTION_EVALUATIONS].insert_one(report_doc)
-        except Exception:
-            pass
+        # Reuse the job submit_answer may already have queued, otherwise queue one;
+        # None when another worker is generating it (or it finished since our read)
+        job = await enqueue_report_generation(interview_id, repos)
 
-        # Update interview with evaluation
         try:
-            db[COLLECTION_INTERVIEWS].update_one(
-                {"interview_id": interview_id},
-                {
-                    "$set": {
-                        "evaluation_id": str(uuid.uuid4()),
-                        "final_recommendation": report.get("recommendation", "maybe"),
-                        "overall_score": report.get("overall_score", 0),
-                        "final_report": report
-                    }
-                }
-            )
-        except Exception:
-            pass
-
-        print(f"✅ Report generated. Recommendation: {report.get('recommendation')}")
-
-        return {"success": True, "interview_id": interview_id, "report": report}
+            with span("report.wait"):
+                report = await asyncio.wait_for(wait_for_report(interview_id, job, repos),
+                                                timeout=REPORT_WAIT_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            return {"success": True, "interview_id": interview_id, "report": None,
+                    "report_status": REPORT_RUNNING}
+        if report is None:
+            return {"success": True, "interview_id": interview_id, "report": None,
+                    "report_status": REPORT_FAILED}
+
+        return {"success": True, "interview_id": interview_id, "report": report,
+                "report_status": REPORT_DONE}
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error completing interview: {e}")
+        api_log.exception("Error completing interview")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1410,28 +1876,13 @@ async def get_evaluation(interview_id: str):
     Retrieve generated evaluation/report with all Q&A
     """
     try:
-        db = get_database()
+        repos = await get_repositories()
         
-        if db is None:
-            # Development mode
-            report = get_mock_report("Test Candidate", "Developer", 8)
-            return {
-                "interview_id": interview_id,
-                "candidate_name": "Test Candidate",
-                "role": "Developer",
-                "experience": "mid",
-                "report": report,
-                "skill_scores": {"React": 75, "TypeScript": 80},
-                "answers": []
-            }
-        
-        evaluation = db[COLLECTION_EVALUATIONS].find_one(
-            {"interview_id": interview_id}
-        )
+        evaluation = await repos.evaluations.get(interview_id)
         
         if not evaluation:
             # If a final_report was stored on the interview doc, return that as a fallback
-            interview = db[COLLECTION_INTERVIEWS].find_one({"interview_id": interview_id})
+            interview = await repos.interviews.get(interview_id)
             if interview and interview.get("final_report"):
                 return {
                     "interview_id": interview_id,
@@ -1447,15 +1898,12 @@ async def get_evaluation(interview_id: str):
                 detail="EVALUATION_NOT_FOUND: Interview not completed yet"
             )
         
-        # Remove MongoDB _id field
-        evaluation.pop("_id", None)
-        
         return evaluation
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error retrieving evaluation: {e}")
+        api_log.exception("Error retrieving evaluation")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1463,22 +1911,23 @@ async def get_evaluation(interview_id: str):
 async def has_evaluation(interview_id: str):
     """
     Check if evaluation exists for this interview
+    report_status: not_started / pending / running / done / failed
     """
     try:
-        db = get_database()
+        repos = await get_repositories()
         
-        if db is None:
-            return {"exists": False}
+        exists = await repos.evaluations.exists(interview_id)
+        interview = await repos.interviews.get(interview_id, {"_id": 0, "report_status": 1}) or {}
+        report_status = interview.get("report_status")
         
-        evaluation = db[COLLECTION_EVALUATIONS].find_one(
-            {"interview_id": interview_id}
-        )
+        if report_status is None:
+            report_status = REPORT_DONE if exists else "not_started"
         
-        return {"exists": evaluation is not None}
+        return {"exists": exists, "report_status": report_status}
     
     except Exception as e:
-        print(f"❌ Error checking evaluation: {e}")
-        return {"exists": False}
+        api_log.exception("Error checking evaluation")
+        return {"exists": False, "report_status": "unknown"}
 
 
 @app.get("/api/interviews/{interview_id}")
@@ -1487,56 +1936,53 @@ async def get_interview(interview_id: str):
     Get interview details and current status
     """
     try:
-        db = get_database()
+        repos = await get_repositories()
         
-        if db is None:
-            return {
-                "interview_id": interview_id,
-                "candidate_name": "Test Candidate",
-                "role": "Developer",
-                "experience": "mid",
-                "status": "in_progress",
-                "current_question": 0,
-                "total_questions": 8
-            }
-        
-        interview = db[COLLECTION_INTERVIEWS].find_one(
-            {"interview_id": interview_id}
-        )
+        # Exclude MongoDB _id and sensitive answer data
+        interview = await repos.interviews.get(interview_id, {"_id": 0, "answers": 0})
         
         if not interview:
             raise HTTPException(status_code=404, detail="Interview not found")
         
-        # Remove MongoDB _id field
-        interview.pop("_id", None)
-        
-        # Remove sensitive data
-        interview.pop("answers", None)
-        
         return interview
     
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error getting interview: {e}")
+        api_log.exception("Error getting interview")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of this worker's metrics"""
+    return Response(content=render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
     try:
-        db = get_database()
-        db_status = "connected" if db is not None else "development_mode"
-        
-        if db is not None:
-            db.command('ping')
+        if STORAGE_BACKEND == "memory":
+            db_status = "memory"
+        elif await mongo.check_health():
+            db_status = "connected"
+        elif mongo.last_error and await get_database() is not None:
+            db_status = "reconnecting"
+        else:
+            db_status = "development_mode"
         
         return {
             "status": "ok",
             "service": "agentic-interview-api",
             "database": db_status,
-            "ai": "gemini" if not DEVELOPMENT_MODE else "development_mode"
+            "ai": model_provider.name if not DEVELOPMENT_MODE else "development_mode",
+            "fake_model": model_provider.stats() if model_provider else None,
+            "llm": llm_limiter.stats(),
+            "llm_cache": response_cache.stats(),
+            "question_bank": question_bank.stats(),
+            "dev_store": dev_store.stats() if db_status in ("memory", "development_mode") else None,
+            "analysis_batching": answer_analyzer.batcher.stats() if answer_analyzer.batcher else {"enabled": False}
         }
     except Exception as e:
         return {
@@ -1552,23 +1998,23 @@ async def health_check():
 async def debug_questions(interview_id: str):
     """Debug endpoint to view generated questions"""
     try:
-        db = get_database()
-        
-        if db is None:
-            return {"questions": [], "note": "Development mode"}
+        repos = await get_repositories()
         
-        questions = list(db[COLLECTION_QUESTIONS].find(
-            {"interview_id": interview_id},
-            {"_id": 0}
-        ))
+        questions = await repos.questions.list_for_interview(interview_id)
         
         return {"questions": questions}
     
     except Exception as e:
-        print(f"❌ Error fetching questions: {e}")
+        api_log.exception("Error fetching questions")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.get("/api/debug/dev-store")
+async def debug_dev_store():
+    """Debug endpoint: in-memory store counters plus its approximate size (walks every document)"""
+    return dev_store.stats(include_size=True)
+
+
 # ============================================================
 # Entry Point
 # ============================================================
@@ -1585,22 +2031,20 @@ if __name__ == "__main__":
         print("   - Using mock data for AI responses")
         print("   - Set GEMINI_API_KEY to enable real AI")
     else:
-        print("✅ Gemini AI Integration Active")
+        print(f"✅ Model provider: {model_provider.name}")
     
-    db = get_database()
-    if db:
-        print("✅ MongoDB Connected")
-    else:
-        print("⚠️  MongoDB in Development Mode")
+    print("✅ Async MongoDB Persistence (pool opens on startup)")
     
     print("✅ Dynamic Question Generation")
     print("✅ AI Answer Analysis")
     print("✅ Agentic Report Generation")
     print("=" * 60)
     
+    # Multiple workers need the app as an import string so each process can load it
     uvicorn.run(
-        app,
+        "main:app" if WEB_CONCURRENCY > 1 else app,
         host="0.0.0.0",
         port=8000,
+        workers=WEB_CONCURRENCY,
         log_level="info"
     )
\ No newline at end of file
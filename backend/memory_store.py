@@ -0,0 +1,374 @@
+"""
+In-memory storage for running without MongoDB (development, demos, load tests)
+- Bounded: least recently used interviews are evicted past a max entry count
+- Interviews idle for longer than the TTL are dropped
+- Thread-safe bookkeeping plus per-interview asyncio locks for read-modify-write
+- Repositories with the same interface as the Mongo ones in repositories.py
+"""
+
+import asyncio
+import copy
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from aggregates import field_key
+from cache import LRUCache
+from idempotency import IDEMPOTENCY_COMPLETED, IDEMPOTENCY_PROCESSING
+from jobs import REPORT_CLAIM_TTL_SECONDS, REPORT_CLAIMED_AT_FIELD, REPORT_DONE, REPORT_PENDING, REPORT_RUNNING
+from repositories import ANSWER_CLAIMS_FIELD, answer_claim_path, versioned
+from tracing import traced_methods
+
+MEMORY_STORE_MAX_INTERVIEWS = int(os.getenv("MEMORY_STORE_MAX_INTERVIEWS", "1000"))
+MEMORY_STORE_TTL_SECONDS = float(os.getenv("MEMORY_STORE_TTL_SECONDS", "21600"))
+MEMORY_IDEMPOTENCY_MAX_KEYS = int(os.getenv("MEMORY_IDEMPOTENCY_MAX_KEYS", "10000"))
+
+
+class _Entry:
+    __slots__ = ("interview", "questions", "evaluation", "lock", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.interview: Optional[Dict[str, Any]] = None
+        self.questions: List[Dict[str, Any]] = []
+        self.evaluation: Optional[Dict[str, Any]] = None
+        self.lock = asyncio.Lock()
+        self.expires_at = expires_at
+
+
+def _deep_size(value: Any) -> int:
+    """Approximate bytes held by a document tree"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_deep_size(k) + _deep_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_deep_size(v) for v in value)
+    return size
+
+
+class MemoryStore:
+    """
+    Everything stored for one interview (document, questions, evaluation) lives
+    in a single entry, so an interview is always evicted as a whole.
+    Reads and writes refresh the entry's TTL.
+    """
+
+    def __init__(self, max_interviews: int = MEMORY_STORE_MAX_INTERVIEWS,
+                 ttl_seconds: float = MEMORY_STORE_TTL_SECONDS):
+        self.max_interviews = max_interviews
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._mutex = threading.RLock()
+        self.evicted_expired = 0
+        self.evicted_capacity = 0
+
+    def _evict(self, now: float):
+        # Entries are kept in last-touched order, so expired ones are at the front
+        while self._entries:
+            interview_id, entry = next(iter(self._entries.items()))
+            if entry.expires_at > now:
+                break
+            del self._entries[interview_id]
+            self.evicted_expired += 1
+        while len(self._entries) > self.max_interviews:
+            self._entries.popitem(last=False)
+            self.evicted_capacity += 1
+
+    def _entry(self, interview_id: str, create: bool = False) -> Optional[_Entry]:
+        with self._mutex:
+            now = time.monotonic()
+            self._evict(now)
+            entry = self._entries.get(interview_id)
+            if entry is None:
+                if not create:
+                    return None
+                entry = _Entry(now + self.ttl_seconds)
+                self._entries[interview_id] = entry
+                self._evict(now)
+            else:
+                entry.expires_at = now + self.ttl_seconds
+                self._entries.move_to_end(interview_id)
+            return entry
+
+    def lock(self, interview_id: str) -> asyncio.Lock:
+        """Serializes read-modify-write sequences on one interview"""
+        return self._entry(interview_id, create=True).lock
+
+    # The documents returned below are live: callers mutate them in place under lock()
+
+    def put_interview(self, interview_id: str, doc: Dict[str, Any]):
+        self._entry(interview_id, create=True).interview = doc
+
+    def get_interview(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(interview_id)
+        return entry.interview if entry else None
+
+    def put_questions(self, interview_id: str, docs: List[Dict[str, Any]]):
+        self._entry(interview_id, create=True).questions = list(docs)
+
+    def add_questions(self, interview_id: str, docs: List[Dict[str, Any]]):
+        self._entry(interview_id, create=True).questions.extend(docs)
+
+    def get_questions(self, interview_id: str) -> List[Dict[str, Any]]:
+        entry = self._entry(interview_id)
+        return entry.questions if entry else []
+
+    def put_evaluation(self, interview_id: str, doc: Dict[str, Any]):
+        self._entry(interview_id, create=True).evaluation = doc
+
+    def get_evaluation(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(interview_id)
+        return entry.evaluation if entry else None
+
+    def stats(self, include_size: bool = False) -> Dict[str, Any]:
+        """Counters are O(1); include_size walks every stored document, so keep it off hot paths"""
+        with self._mutex:
+            self._evict(time.monotonic())
+            entries = list(self._entries.values())
+        stats = {
+            "interviews": len(entries),
+            "max_interviews": self.max_interviews,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted_expired": self.evicted_expired,
+            "evicted_capacity": self.evicted_capacity,
+        }
+        if include_size:
+            approx_bytes = sum(_deep_size(e.interview) + _deep_size(e.questions) + _deep_size(e.evaluation)
+                               for e in entries)
+            stats["approx_memory_mb"] = round(approx_bytes / 2**20, 2)
+        return stats
+
+
+# ---------------- Repositories ----------------
+
+def _project(doc: Optional[Dict[str, Any]], projection: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Top-level field projection like MongoDB's (inclusion or exclusion), on a copy"""
+    if doc is None:
+        return None
+    fields = {k: v for k, v in (projection or {}).items() if k != "_id"}
+    if fields and all(fields.values()):
+        return copy.deepcopy({k: doc[k] for k in fields if k in doc})
+    return copy.deepcopy({k: v for k, v in doc.items() if k not in fields})
+
+
+def _set_path(doc: Dict[str, Any], path: str, value: Any):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _get_path(doc: Dict[str, Any], path: str, default: Any = None) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return default
+        doc = doc[part]
+    return doc
+
+
+def apply_update(doc: Dict[str, Any], update: Dict[str, Any]):
+    """The update operators the repositories use: $set, $unset, $inc, $push, $addToSet"""
+    for path, value in update.get("$set", {}).items():
+        _set_path(doc, path, copy.deepcopy(value))
+    for path in update.get("$unset", {}):
+        *parents, leaf = path.split(".")
+        parent = _get_path(doc, ".".join(parents)) if parents else doc
+        if isinstance(parent, dict):
+            parent.pop(leaf, None)
+    for path, amount in update.get("$inc", {}).items():
+        _set_path(doc, path, _get_path(doc, path, 0) + amount)
+    for path, value in update.get("$push", {}).items():
+        items = _get_path(doc, path)
+        if items is None:
+            items = []
+            _set_path(doc, path, items)
+        items.append(copy.deepcopy(value))
+    for path, value in update.get("$addToSet", {}).items():
+        items = _get_path(doc, path)
+        if items is None:
+            items = []
+            _set_path(doc, path, items)
+        if value not in items:
+            items.append(copy.deepcopy(value))
+
+
+@traced_methods("db")
+class MemoryInterviewRepository:
+    """InterviewRepository over the in-memory store"""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def create(self, interview_doc: Dict[str, Any]):
+        self.store.put_interview(interview_doc["interview_id"], copy.deepcopy(interview_doc))
+
+    async def get(self, interview_id: str,
+                  projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return _project(self.store.get_interview(interview_id), projection)
+
+    async def update(self, interview_id: str, update: Dict[str, Any]):
+        async with self.store.lock(interview_id):
+            doc = self.store.get_interview(interview_id)
+            if doc is not None:
+                apply_update(doc, update)
+
+    async def set_fields(self, interview_id: str, fields: Dict[str, Any]):
+        await self.update(interview_id, {"$set": fields})
+
+    async def compare_and_set(self, interview_id: str, version: int, update: Dict[str, Any]) -> bool:
+        async with self.store.lock(interview_id):
+            doc = self.store.get_interview(interview_id)
+            if doc is None or doc.get("version", 0) != version:
+                return False
+            apply_update(doc, versioned(update))
+            return True
+
+    async def mark_question_asked(self, interview_id: str, question_id: str, version: int) -> bool:
+        return await self.compare_and_set(interview_id, version, {
+            "$addToSet": {"asked_question_ids": question_id},
+            "$set": {"current_question_id": question_id}
+        })
+
+    async def get_answer_state(self, interview_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        doc = self.store.get_interview(interview_id)
+        if doc is None:
+            return None
+        answer = next((a for a in doc.get("answers", []) if a.get("question_id") == question_id), None)
+        return {
+            "version": doc.get("version", 0),
+            "current_question_id": doc.get("current_question_id"),
+            "claimed_at": doc.get(ANSWER_CLAIMS_FIELD, {}).get(field_key(question_id)),
+            "answer": copy.deepcopy(answer)
+        }
+
+    async def release_answer_claim(self, interview_id: str, question_id: str):
+        await self.update(interview_id, versioned({"$unset": {answer_claim_path(question_id): ""}}))
+
+    async def record_answer(self, interview_id: str, answer_record: Dict[str, Any],
+                            analysis: Dict[str, Any], skill_name: str, skill_score: Any,
+                            increments: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        async with self.store.lock(interview_id):
+            doc = self.store.get_interview(interview_id)
+            if doc is None:
+                return None
+            if any(a.get("question_id") == answer_record["question_id"] for a in doc.get("answers", [])):
+                return None
+            apply_update(doc, {
+                "$push": {"answers": answer_record, "evaluations": analysis},
+                "$inc": {"current_question": 1, "version": 1, **(increments or {})},
+                "$set": {f"skill_scores.{field_key(skill_name)}": skill_score},
+                "$unset": {answer_claim_path(answer_record["question_id"]): "", "current_question_id": ""}
+            })
+            return {
+                "total_questions": doc.get("total_questions", 0),
+                "evaluations_count": len(doc.get("evaluations", []))
+            }
+
+    async def claim_report_job(self, interview_id: str) -> bool:
+        async with self.store.lock(interview_id):
+            doc = self.store.get_interview(interview_id)
+            if doc is None or doc.get("report_status") == REPORT_DONE:
+                return False
+            now = datetime.utcnow()
+            claimed_at = doc.get(REPORT_CLAIMED_AT_FIELD)
+            if (doc.get("report_status") in (REPORT_PENDING, REPORT_RUNNING) and claimed_at is not None
+                    and (now - claimed_at).total_seconds() < REPORT_CLAIM_TTL_SECONDS):
+                return False
+            doc["report_status"] = REPORT_PENDING
+            doc[REPORT_CLAIMED_AT_FIELD] = now
+            return True
+
+    async def set_report_status(self, interview_id: str, status: str,
+                                fields: Optional[Dict[str, Any]] = None):
+        await self.set_fields(interview_id, {"report_status": status, **(fields or {})})
+
+
+@traced_methods("db")
+class MemoryQuestionRepository:
+    """QuestionRepository over the in-memory store"""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def insert_many(self, question_docs: List[Dict[str, Any]]):
+        by_interview: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in question_docs:
+            by_interview.setdefault(doc["interview_id"], []).append(copy.deepcopy(doc))
+        for interview_id, docs in by_interview.items():
+            self.store.add_questions(interview_id, docs)
+
+    async def get_by_id(self, interview_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        for doc in self.store.get_questions(interview_id):
+            if doc.get("question_id") == question_id:
+                return copy.deepcopy(doc)
+        return None
+
+    async def list_for_interview(self, interview_id: str) -> List[Dict[str, Any]]:
+        return sorted(copy.deepcopy(self.store.get_questions(interview_id)), key=lambda q: q.get("number", 0))
+
+
+@traced_methods("db")
+class MemoryEvaluationRepository:
+    """EvaluationRepository over the in-memory store"""
+
+    def __init__(self, store: MemoryStore):
+        self.store = store
+
+    async def save(self, report_doc: Dict[str, Any]):
+        self.store.put_evaluation(report_doc["interview_id"], copy.deepcopy(report_doc))
+
+    async def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self.store.get_evaluation(interview_id))
+
+    async def exists(self, interview_id: str) -> bool:
+        return self.store.get_evaluation(interview_id) is not None
+
+
+@traced_methods("db")
+class MemoryIdempotencyRepository:
+    """IdempotencyRepository over a bounded LRU; entries carry their own expiry"""
+
+    def __init__(self, max_keys: int = MEMORY_IDEMPOTENCY_MAX_KEYS):
+        # Per-record expiry below; the LRU's own TTL only has to outlast the longest window
+        self.records = LRUCache(max_entries=max_keys, ttl_seconds=float("inf"))
+
+    def _live(self, key: str) -> Optional[Dict[str, Any]]:
+        record = self.records.get(key)
+        if record is None or record["expires_at"] <= time.monotonic():
+            return None
+        return record
+
+    async def claim(self, key: str, fingerprint: str, timeout_seconds: float) -> Optional[Dict[str, Any]]:
+        record = self._live(key)
+        if record is not None:
+            return copy.deepcopy(record)
+        self.records.set(key, {
+            "status": IDEMPOTENCY_PROCESSING,
+            "fingerprint": fingerprint,
+            "expires_at": time.monotonic() + timeout_seconds
+        })
+        return None
+
+    async def complete(self, key: str, response: Any, status_code: int, ttl_seconds: float):
+        record = self.records.get(key)
+        if record is not None:
+            record.update(status=IDEMPOTENCY_COMPLETED, response=copy.deepcopy(response),
+                          status_code=status_code, expires_at=time.monotonic() + ttl_seconds)
+
+    async def release(self, key: str):
+        record = self.records.get(key)
+        if record is not None and record["status"] == IDEMPOTENCY_PROCESSING:
+            record["expires_at"] = 0.0
+
+
+class MemoryRepositories:
+    """Same shape as repositories.Repositories, backed by a MemoryStore"""
+
+    def __init__(self, store: MemoryStore):
+        self.interviews = MemoryInterviewRepository(store)
+        self.questions = MemoryQuestionRepository(store)
+        self.evaluations = MemoryEvaluationRepository(store)
+        self.idempotency = MemoryIdempotencyRepository()
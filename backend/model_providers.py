@@ -0,0 +1,225 @@
+"""
+Model providers
+- The agents only need a model with generate_content_async(prompt, stream=False)
+  (what the limiter in llm.py calls); a provider hands out such models by name
+- "gemini": Google Gemini (needs GEMINI_API_KEY)
+- "fake": a local, deterministic stand-in for offline load and failure testing.
+  It answers question, analysis, batch analysis and report prompts with
+  realistic JSON after a configurable latency, and follows FAKE_LLM_SCHEDULE to
+  return malformed, invalid, slow or failing responses on chosen calls
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import zlib
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "gemini").lower()
+
+# Fake provider settings
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))
+FAKE_LLM_JITTER_MS = float(os.getenv("FAKE_LLM_JITTER_MS", "100"))
+# Extra latency of a "slow" call; above LLM_CALL_TIMEOUT_SECONDS it becomes a timeout
+FAKE_LLM_SLOW_MS = float(os.getenv("FAKE_LLM_SLOW_MS", "5000"))
+# Outcome per call, repeated in order, e.g. "ok*8,fenced,truncated,ok*4,slow,error"
+FAKE_LLM_SCHEDULE = os.getenv("FAKE_LLM_SCHEDULE", "ok")
+FAKE_LLM_SEED = int(os.getenv("FAKE_LLM_SEED", "7"))
+
+# ok:        valid JSON
+# fenced:    valid JSON inside prose and a ```json fence (recovered by extraction)
+# truncated: output cut off mid-object (no parseable JSON)
+# invalid:   parseable JSON that fails the agent's schema
+# slow:      valid JSON after FAKE_LLM_SLOW_MS extra latency
+# error:     the call raises, like a quota or server error from the API
+FAKE_OUTCOMES = ("ok", "fenced", "truncated", "invalid", "slow", "error")
+
+
+class FakeModelError(RuntimeError):
+    pass
+
+
+def parse_schedule(schedule: str) -> List[str]:
+    """ "ok*3,error" -> ["ok", "ok", "ok", "error"] """
+    outcomes = []
+    for entry in schedule.split(","):
+        name, _, count = entry.strip().partition("*")
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name not in FAKE_OUTCOMES:
+            raise ValueError(f"Unknown FAKE_LLM_SCHEDULE outcome {name!r} (expected one of {', '.join(FAKE_OUTCOMES)})")
+        outcomes.extend([name] * (int(count) if count else 1))
+    return outcomes or ["ok"]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Replies depend only on the prompt, so the same prompt always gets the same
+    content. Outcomes follow the schedule by call number and latency jitter
+    comes from a seeded generator, so a sequential run is fully repeatable.
+    """
+
+    def __init__(self, latency_ms: float = FAKE_LLM_LATENCY_MS, jitter_ms: float = FAKE_LLM_JITTER_MS,
+                 slow_ms: float = FAKE_LLM_SLOW_MS, schedule: str = FAKE_LLM_SCHEDULE, seed: int = FAKE_LLM_SEED):
+        self.latency_seconds = latency_ms / 1000
+        self.jitter_seconds = jitter_ms / 1000
+        self.slow_seconds = slow_ms / 1000
+        self.schedule = parse_schedule(schedule)
+        self.random = random.Random(seed)
+        self.calls = 0
+        self.outcomes: Counter = Counter()
+
+    def _next_outcome(self) -> str:
+        outcome = self.schedule[self.calls % len(self.schedule)]
+        self.calls += 1
+        self.outcomes[outcome] += 1
+        return outcome
+
+    # ---- replies ----
+
+    @staticmethod
+    def _analysis(rng: random.Random) -> Dict[str, Any]:
+        score = rng.randint(40, 95)
+        level = "excellent" if score >= 85 else "good" if score >= 70 else "adequate" if score >= 55 else "poor"
+        return {
+            "overall_score": score,
+            "key_points_covered": ["core concept", "a practical example"][:rng.randint(1, 2)],
+            "missing_points": ["edge cases", "trade-offs"][:rng.randint(0, 2)],
+            "communication_quality": level,
+            "technical_accuracy": level,
+            "depth_of_knowledge": "deep" if score >= 85 else "good" if score >= 70 else "adequate",
+            "feedback_to_candidate": f"Score {score}: clear structure; say more about edge cases and trade-offs."
+        }
+
+    def reply(self, prompt: str) -> Dict[str, Any]:
+        rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+        if "hiring manager" in prompt:
+            average = re.search(r"Average answer score: ([\d.]+)", prompt)
+            score = int(float(average.group(1))) if average else rng.randint(50, 90)
+            return {
+                "overall_score": score,
+                "technical_score": max(0, min(100, score + rng.randint(-5, 5))),
+                "communication_score": max(0, min(100, score + rng.randint(-5, 5))),
+                "cultural_fit_score": max(0, min(100, score + rng.randint(-5, 5))),
+                "recommendation": "strong-hire" if score >= 85 else "hire" if score >= 70
+                else "maybe" if score >= 55 else "no-hire",
+                "final_reasoning": f"Averaged {score}/100 across the interview with consistent answers.",
+                "strengths": ["Explains design decisions", "Knows the core tooling"],
+                "development_areas": ["Failure handling", "Testing strategy"],
+                "role_fit_assessment": "Matches the level the role needs in the assessed skills.",
+                "three_month_plan": ["Own a small service", "Lead an incident review", "Improve test coverage"],
+                "next_round_questions": ["Walk through an outage you handled.", "How do you test async code?"]
+            }
+        items = [int(i) for i in re.findall(r"^### ITEM (\d+)$", prompt, re.MULTILINE)]
+        if items:
+            return {"analyses": [{"index": i, **self._analysis(rng)} for i in items]}
+        if '"questions"' in prompt:
+            total = re.search(r"Total questions: (\d+)", prompt)
+            count = int(total.group(1)) if total else 8
+            skills_line = re.search(r"Skills to assess: (.*)", prompt)
+            skills = [re.sub(r"\s*\(.*\)$", "", s).strip() for s in (skills_line.group(1) if skills_line else "General").split(",")]
+            topic = rng.randint(1000, 9999)
+            single = re.search(r'set "difficulty": "(\w+)" on every question', prompt)
+            return {"questions": [{
+                "id": f"q_{n}",
+                "number": n,
+                "question": f"In {skills[(n - 1) % len(skills)]}, how would you approach problem #{topic}-{n}: "
+                            f"a service that must stay fast as its data grows?",
+                "skill_tested": skills[(n - 1) % len(skills)],
+                "difficulty": single.group(1) if single else ("easy", "medium", "hard")[min(2, (n - 1) * 3 // count)],
+                "expected_key_points": ["data structures", "caching", "measuring before optimizing"],
+                "why_this_question": "Shows how the candidate reasons about performance trade-offs",
+                "follow_up_prompt": "What would you measure first?"
+            } for n in range(1, count + 1)]}
+        return self._analysis(rng)
+
+    def render(self, prompt: str, outcome: str) -> str:
+        text = json.dumps(self.reply(prompt), indent=2)
+        if outcome == "fenced":
+            return f"Sure! Here is the evaluation you asked for:\n```json\n{text}\n```\nLet me know if you need more."
+        if outcome == "truncated":
+            return text[:len(text) * 3 // 5]
+        if outcome == "invalid":
+            return json.dumps({"status": "ok", "note": "response format not followed"})
+        return text
+
+    # ---- model API (as used by llm.ModelCallLimiter) ----
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        outcome = self._next_outcome()
+        delay = self.latency_seconds + self.random.uniform(0, self.jitter_seconds)
+        if outcome == "slow":
+            delay += self.slow_seconds
+        await asyncio.sleep(delay)
+        if outcome == "error":
+            raise FakeModelError("503 The model is overloaded. Please try again later.")
+        text = self.render(prompt, outcome)
+        if not stream:
+            return FakeResponse(text)
+
+        async def chunks():
+            for i in range(0, len(text), 64):
+                yield FakeResponse(text[i:i + 64])
+        return chunks()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "outcomes": dict(self.outcomes), "schedule_length": len(self.schedule)}
+
+
+# ============================================================
+# Providers
+# ============================================================
+
+class ModelProvider(ABC):
+    name = ""
+
+    @abstractmethod
+    def get_model(self, model_name: str):
+        """A model object with generate_content_async(prompt, stream=False)"""
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+
+class GeminiProvider(ModelProvider):
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+
+    def get_model(self, model_name: str):
+        return self._genai.GenerativeModel(model_name)
+
+
+class FakeProvider(ModelProvider):
+    """All agents share one fake model, so the schedule counts every call in the process"""
+    name = "fake"
+
+    def __init__(self, model: Optional[FakeModel] = None):
+        self.model = model or FakeModel()
+
+    def get_model(self, model_name: str):
+        return self.model
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        return self.model.stats()
+
+
+def create_provider(name: str = MODEL_PROVIDER, api_key: Optional[str] = None) -> ModelProvider:
+    if name == "gemini":
+        return GeminiProvider(api_key)
+    if name == "fake":
+        return FakeProvider()
+    raise ValueError(f"Unknown MODEL_PROVIDER {name!r} (expected gemini or fake)")
@@ -0,0 +1,269 @@
+"""
+Pre-generated question bank
+- Validated question pools per (role, skill, proficiency, difficulty)
+- Interviews are assembled from the pools without an LLM call
+- An async refill worker tops up pools that fall below a low watermark
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+from logs import get_logger
+
+QUESTION_BANK_ENABLED = os.getenv("QUESTION_BANK_ENABLED", "true").lower() == "true"
+QUESTION_BANK_LOW_WATERMARK = int(os.getenv("QUESTION_BANK_LOW_WATERMARK", "4"))
+QUESTION_BANK_REFILL_BATCH = int(os.getenv("QUESTION_BANK_REFILL_BATCH", "8"))
+# Existing questions shown to the generator on refill so it writes new ones
+QUESTION_BANK_REFILL_EXCLUDE = 30
+COLLECTION_QUESTION_BANK = "question_bank"
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+PoolKey = Tuple[str, str, str, str]  # (role, skill, proficiency, difficulty)
+
+log = get_logger("llm")
+
+# source(role, skill, proficiency, difficulty, count, existing question texts) -> question dicts
+QuestionSource = Callable[[str, str, str, str, int, List[str]], Awaitable[List[Dict[str, Any]]]]
+
+
+def pool_key(role: str, skill: str, proficiency: str, difficulty: str) -> PoolKey:
+    # Role and skill keep their casing: skill is shown to the candidate as skill_tested
+    return (role.strip(), skill.strip(), (proficiency or "intermediate").strip().lower(),
+            difficulty.strip().lower())
+
+
+def difficulty_for_slot(index: int, total: int) -> str:
+    """Same progression as the generated sets: easy, then medium, then hard"""
+    if index < total // 3:
+        return "easy"
+    if index < 2 * total // 3:
+        return "medium"
+    return "hard"
+
+
+def validate_bank_question(question: Dict[str, Any]) -> bool:
+    """Only well-formed questions are admitted to a pool"""
+    text = (question.get("question") or "").strip()
+    return (
+        len(text) >= 20
+        and text.endswith(("?", "."))
+        and bool(question.get("skill_tested"))
+        and question.get("difficulty") in DIFFICULTIES
+    )
+
+
+class MemoryBankStore:
+    """Pools kept in process memory (development mode)"""
+
+    def __init__(self):
+        self._pools: Dict[PoolKey, List[Dict[str, Any]]] = {}
+
+    async def count(self, key: PoolKey) -> int:
+        return len(self._pools.get(key, []))
+
+    async def sample(self, key: PoolKey, size: int) -> List[Dict[str, Any]]:
+        pool = self._pools.get(key, [])
+        return random.sample(pool, min(size, len(pool)))
+
+    async def add(self, key: PoolKey, questions: List[Dict[str, Any]]) -> int:
+        pool = self._pools.setdefault(key, [])
+        known = {q["question"] for q in pool}
+        added = [q for q in questions if q["question"] not in known]
+        pool.extend(added)
+        return len(added)
+
+
+class MongoBankStore:
+    """Pools stored in the question_bank collection, shared by all workers"""
+
+    def __init__(self, db):
+        self.collection = db[COLLECTION_QUESTION_BANK]
+
+    @staticmethod
+    def _filter(key: PoolKey) -> Dict[str, str]:
+        role, skill, proficiency, difficulty = key
+        return {"role": role, "skill": skill, "proficiency": proficiency, "difficulty": difficulty}
+
+    async def ensure_indexes(self):
+        await self.collection.create_index(
+            [("role", ASCENDING), ("skill", ASCENDING), ("proficiency", ASCENDING),
+             ("difficulty", ASCENDING), ("question", ASCENDING)],
+            unique=True,
+            name="pool_question_unique"
+        )
+
+    async def count(self, key: PoolKey) -> int:
+        return await self.collection.count_documents(self._filter(key))
+
+    async def sample(self, key: PoolKey, size: int) -> List[Dict[str, Any]]:
+        cursor = self.collection.aggregate([
+            {"$match": self._filter(key)},
+            {"$sample": {"size": size}},
+            {"$project": {"_id": 0}}
+        ])
+        return await cursor.to_list(length=size)
+
+    async def add(self, key: PoolKey, questions: List[Dict[str, Any]]) -> int:
+        docs = [{**self._filter(key), **q, "created_at": datetime.utcnow()} for q in questions]
+        if not docs:
+            return 0
+        try:
+            result = await self.collection.insert_many(docs, ordered=False)
+            return len(result.inserted_ids)
+        except PyMongoError as e:
+            # Duplicate questions are skipped by the unique index
+            details = getattr(e, "details", None) or {}
+            return details.get("nInserted", 0)
+
+
+class QuestionBank:
+    """
+    Assembles interviews from pre-generated pools.
+    assemble() returns None when any pool is short, so the caller can fall
+    back to live generation; short pools are queued for refill either way.
+    """
+
+    def __init__(self, get_database: Callable[[], Awaitable[Any]], source: QuestionSource,
+                 enabled: bool = QUESTION_BANK_ENABLED):
+        self._get_database = get_database
+        self._source = source
+        self.enabled = enabled
+        self._memory_store = MemoryBankStore()
+        self._mongo_indexes_ready = False
+        self._refill_queue: Optional[asyncio.Queue] = None
+        self._refill_task: Optional[asyncio.Task] = None
+        self._queued: Set[PoolKey] = set()
+        self.assembled = 0
+        self.misses = 0
+        self.refills = 0
+
+    async def _store(self):
+        db = await self._get_database()
+        if db is None:
+            return self._memory_store
+        store = MongoBankStore(db)
+        if not self._mongo_indexes_ready:
+            await store.ensure_indexes()
+            self._mongo_indexes_ready = True
+        return store
+
+    # ---------------- Assembly ----------------
+
+    async def assemble(self, role: str, selected_skills: List[Dict[str, Any]],
+                       total_questions: int = 8) -> Optional[List[Dict[str, Any]]]:
+        if not self.enabled or not selected_skills:
+            return None
+
+        store = await self._store()
+
+        # Work out how many questions each pool has to supply
+        slots = []
+        demand: Dict[PoolKey, int] = {}
+        for i in range(total_questions):
+            skill = selected_skills[i % len(selected_skills)]
+            key = pool_key(role, skill.get("skill_name", "General"), skill.get("proficiency_level", "intermediate"),
+                           difficulty_for_slot(i, total_questions))
+            slots.append(key)
+            demand[key] = demand.get(key, 0) + 1
+
+        # Over-sample so the same text drawn from two pools can be skipped
+        drawn: Dict[PoolKey, List[Dict[str, Any]]] = {}
+        for key, needed in demand.items():
+            drawn[key] = await store.sample(key, needed * 2)
+            if await store.count(key) < needed + QUESTION_BANK_LOW_WATERMARK:
+                self.request_refill(key)
+
+        questions = []
+        used_texts: Set[str] = set()
+        for number, key in enumerate(slots, start=1):
+            candidates = drawn[key]
+            while candidates and candidates[-1]["question"] in used_texts:
+                candidates.pop()
+            if not candidates:
+                self.misses += 1
+                return None
+            q = candidates.pop()
+            used_texts.add(q["question"])
+            questions.append({
+                "id": f"q_{number}_{hashlib.sha1(q['question'].encode('utf-8')).hexdigest()[:8]}",
+                "number": number,
+                "question": q["question"],
+                "skill_tested": q["skill_tested"],
+                "difficulty": q["difficulty"],
+                "category": q.get("category", ""),
+                "expected_key_points": q.get("expected_key_points", []),
+                "why_this_question": q.get("why_this_question", ""),
+                "follow_up_prompt": q.get("follow_up_prompt", "")
+            })
+        self.assembled += 1
+        return questions
+
+    # ---------------- Refill worker ----------------
+
+    def request_refill(self, key: PoolKey):
+        """Queue a pool for top-up (deduplicated while queued)"""
+        if key in self._queued:
+            return
+        if self._refill_queue is None:
+            self._refill_queue = asyncio.Queue()
+            self._refill_task = asyncio.create_task(self._refill_worker(), name="question-bank-refill")
+        self._queued.add(key)
+        self._refill_queue.put_nowait(key)
+
+    async def _refill_worker(self):
+        while True:
+            key = await self._refill_queue.get()
+            try:
+                await self.refill(key)
+            except Exception as e:
+                log.warning("Question bank refill failed", extra={"pool": key, "error": str(e)})
+            finally:
+                self._queued.discard(key)
+                self._refill_queue.task_done()
+
+    async def refill(self, key: PoolKey, count: int = QUESTION_BANK_REFILL_BATCH) -> int:
+        role, skill, proficiency, difficulty = key
+        store = await self._store()
+        existing = [q["question"] for q in await store.sample(key, QUESTION_BANK_REFILL_EXCLUDE)]
+        generated = await self._source(role, skill, proficiency, difficulty, count, existing)
+        valid = []
+        for q in generated:
+            if q.get("difficulty") == difficulty and validate_bank_question(q):
+                valid.append({
+                    "question": q["question"].strip(),
+                    "skill_tested": q["skill_tested"],
+                    "difficulty": difficulty,
+                    "category": q.get("category", ""),
+                    "topics": [q["skill_tested"]],
+                    "expected_key_points": q.get("expected_key_points", []),
+                    "why_this_question": q.get("why_this_question", ""),
+                    "follow_up_prompt": q.get("follow_up_prompt", "")
+                })
+        added = await store.add(key, valid)
+        self.refills += 1
+        return added
+
+    async def stop(self):
+        if self._refill_task is not None:
+            self._refill_task.cancel()
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+        self._refill_task = None
+        self._refill_queue = None
+        self._queued.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "assembled": self.assembled,
+            "misses": self.misses,
+            "refills": self.refills,
+            "refills_queued": len(self._queued),
+        }
@@ -0,0 +1,254 @@
+"""
+Async persistence layer for the interview API
+- Motor-backed repositories for interviews, questions and evaluations
+- Endpoints depend on these instead of raw collection calls
+- Every repository call is a "db" tracing span
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from aggregates import field_key
+from database import COLLECTION_EVALUATIONS, COLLECTION_IDEMPOTENCY, COLLECTION_INTERVIEWS, COLLECTION_QUESTIONS
+from idempotency import IDEMPOTENCY_COMPLETED, IDEMPOTENCY_PROCESSING
+from jobs import REPORT_CLAIM_TTL_SECONDS, REPORT_CLAIMED_AT_FIELD, REPORT_DONE, REPORT_PENDING, REPORT_RUNNING
+from tracing import traced_methods
+
+ANSWER_CLAIMS_FIELD = "answer_claims"
+# Claim retries when the key is released between a collision and the re-read
+IDEMPOTENCY_CLAIM_ATTEMPTS = 3
+
+
+def answer_claim_path(question_id: str) -> str:
+    return f"{ANSWER_CLAIMS_FIELD}.{field_key(question_id)}"
+
+
+def versioned(update: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the version bump every compare-and-set write carries"""
+    return {**update, "$inc": {**update.get("$inc", {}), "version": 1}}
+
+
+@traced_methods("db")
+class InterviewRepository:
+    """Interview session documents (progress, answers, skill scores, final report)"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db[COLLECTION_INTERVIEWS]
+
+    async def create(self, interview_doc: Dict[str, Any]):
+        await self.collection.insert_one(interview_doc)
+
+    async def get(self, interview_id: str,
+                  projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"interview_id": interview_id}, projection)
+
+    async def update(self, interview_id: str, update: Dict[str, Any]):
+        await self.collection.update_one({"interview_id": interview_id}, update)
+
+    async def set_fields(self, interview_id: str, fields: Dict[str, Any]):
+        await self.update(interview_id, {"$set": fields})
+
+    async def compare_and_set(self, interview_id: str, version: int, update: Dict[str, Any]) -> bool:
+        """
+        Apply the update only if the document is still at the version the caller
+        read, bumping the version. Returns False if another write got there first.
+        Interviews stored before versioning count as version 0.
+        """
+        result = await self.collection.update_one(
+            {"interview_id": interview_id, "version": version if version else {"$in": [0, None]}},
+            versioned(update)
+        )
+        return result.modified_count == 1
+
+    async def mark_question_asked(self, interview_id: str, question_id: str, version: int) -> bool:
+        """Serve question_id as the current question (False if progress moved since version)"""
+        return await self.compare_and_set(interview_id, version, {
+            "$addToSet": {"asked_question_ids": question_id},
+            "$set": {"current_question_id": question_id}
+        })
+
+    async def get_answer_state(self, interview_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        """
+        What submit needs to know about one question, without loading every answer:
+        version, the question currently being served, when this question was claimed
+        (None if unclaimed) and the stored answer record (None if unanswered).
+        None if the interview is not found.
+        """
+        doc = await self.collection.find_one(
+            {"interview_id": interview_id},
+            {
+                "_id": 0,
+                "version": 1,
+                "current_question_id": 1,
+                answer_claim_path(question_id): 1,
+                "answers": {"$elemMatch": {"question_id": question_id}}
+            }
+        )
+        if doc is None:
+            return None
+        return {
+            "version": doc.get("version", 0),
+            "current_question_id": doc.get("current_question_id"),
+            "claimed_at": doc.get(ANSWER_CLAIMS_FIELD, {}).get(field_key(question_id)),
+            "answer": (doc.get("answers") or [None])[0]
+        }
+
+    async def release_answer_claim(self, interview_id: str, question_id: str):
+        await self.update(interview_id, versioned({"$unset": {answer_claim_path(question_id): ""}}))
+
+    async def record_answer(self, interview_id: str, answer_record: Dict[str, Any],
+                            analysis: Dict[str, Any], skill_name: str, skill_score: Any,
+                            increments: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Store an analyzed answer in one atomic update: push the answer and its
+        evaluation, bump current_question and version, set the skill score and
+        add the answer to the running statistics (increments are dotted $inc fields).
+        The filter only matches if this question has no stored answer yet, so
+        concurrent submits from different workers can't advance progress twice.
+        Clears the question's answer claim and the current question marker.
+        Returns only the progress counters (evaluations_count, total_questions),
+        not the growing answers array; None if not found or already answered.
+        """
+        return await self.collection.find_one_and_update(
+            {"interview_id": interview_id, "answers.question_id": {"$ne": answer_record["question_id"]}},
+            {
+                "$push": {"answers": answer_record, "evaluations": analysis},
+                "$inc": {"current_question": 1, "version": 1, **(increments or {})},
+                "$set": {f"skill_scores.{field_key(skill_name)}": skill_score},
+                "$unset": {answer_claim_path(answer_record["question_id"]): "", "current_question_id": ""}
+            },
+            projection={
+                "_id": 0,
+                "total_questions": 1,
+                "evaluations_count": {"$size": "$evaluations"}
+            },
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def claim_report_job(self, interview_id: str) -> bool:
+        """
+        Atomically move report_status to pending.
+        Returns False if a report is already pending, running or done, so only
+        one caller ever enqueues generation for an interview. A pending/running
+        claim older than REPORT_CLAIM_TTL_SECONDS (its worker died) can be taken over.
+        """
+        now = datetime.utcnow()
+        stale_before = now - timedelta(seconds=REPORT_CLAIM_TTL_SECONDS)
+        result = await self.collection.update_one(
+            {
+                "interview_id": interview_id,
+                "$or": [
+                    {"report_status": {"$nin": [REPORT_PENDING, REPORT_RUNNING, REPORT_DONE]}},
+                    # Missing timestamp: claimed before claims were timestamped
+                    {"report_status": {"$in": [REPORT_PENDING, REPORT_RUNNING]},
+                     REPORT_CLAIMED_AT_FIELD: {"$not": {"$gt": stale_before}}}
+                ]
+            },
+            {"$set": {"report_status": REPORT_PENDING, REPORT_CLAIMED_AT_FIELD: now}}
+        )
+        return result.modified_count == 1
+
+    async def set_report_status(self, interview_id: str, status: str,
+                                fields: Optional[Dict[str, Any]] = None):
+        await self.set_fields(interview_id, {"report_status": status, **(fields or {})})
+
+
+@traced_methods("db")
+class QuestionRepository:
+    """Generated questions, one document per question per interview"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db[COLLECTION_QUESTIONS]
+
+    async def insert_many(self, question_docs: List[Dict[str, Any]]):
+        """Store a freshly generated question set in one round trip"""
+        if question_docs:
+            await self.collection.insert_many(question_docs, ordered=False)
+
+    async def get_by_id(self, interview_id: str, question_id: str) -> Optional[Dict[str, Any]]:
+        # question_ids are only unique within an interview
+        return await self.collection.find_one({"interview_id": interview_id, "question_id": question_id})
+
+    async def list_for_interview(self, interview_id: str) -> List[Dict[str, Any]]:
+        """Whole question set for an interview, ordered by number, in a single query"""
+        cursor = self.collection.find({"interview_id": interview_id}, {"_id": 0}).sort("number", 1)
+        return await cursor.to_list(length=None)
+
+
+@traced_methods("db")
+class EvaluationRepository:
+    """Final evaluation reports, one per completed interview"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db[COLLECTION_EVALUATIONS]
+
+    async def save(self, report_doc: Dict[str, Any]):
+        """Insert or replace the interview's report (a regenerated report replaces the earlier one)"""
+        await self.collection.replace_one({"interview_id": report_doc["interview_id"]}, report_doc, upsert=True)
+
+    async def get(self, interview_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"interview_id": interview_id}, {"_id": 0})
+
+    async def exists(self, interview_id: str) -> bool:
+        return await self.collection.find_one({"interview_id": interview_id}, {"_id": 1}) is not None
+
+
+@traced_methods("db")
+class IdempotencyRepository:
+    """Idempotency-Key records: claimed while the request runs, then the stored response"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.collection = db[COLLECTION_IDEMPOTENCY]
+
+    async def claim(self, key: str, fingerprint: str, timeout_seconds: float) -> Optional[Dict[str, Any]]:
+        """
+        Claim key for a new request. Returns None if this caller now owns it,
+        otherwise the live record (in progress or completed).
+        Expired records are taken over in the same operation: the filter only
+        matches an expired record, so a live one makes the upsert collide on _id.
+        """
+        for _ in range(IDEMPOTENCY_CLAIM_ATTEMPTS):
+            now = datetime.utcnow()
+            try:
+                await self.collection.update_one(
+                    {"_id": key, "expires_at": {"$lte": now}},
+                    {"$set": {
+                        "status": IDEMPOTENCY_PROCESSING,
+                        "fingerprint": fingerprint,
+                        "expires_at": now + timedelta(seconds=timeout_seconds)
+                    }, "$unset": {"response": "", "status_code": ""}},
+                    upsert=True
+                )
+                return None
+            except DuplicateKeyError:
+                record = await self.collection.find_one({"_id": key})
+                if record is not None:
+                    return record
+                # The owner released the key after our collision: claim again
+        # Still contended: report it as in progress so the client retries
+        return {"status": IDEMPOTENCY_PROCESSING, "fingerprint": fingerprint}
+
+    async def complete(self, key: str, response: Any, status_code: int, ttl_seconds: float):
+        await self.collection.update_one({"_id": key}, {"$set": {
+            "status": IDEMPOTENCY_COMPLETED,
+            "response": response,
+            "status_code": status_code,
+            "expires_at": datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        }})
+
+    async def release(self, key: str):
+        await self.collection.delete_one({"_id": key, "status": IDEMPOTENCY_PROCESSING})
+
+
+class Repositories:
+    """Bundle of repositories sharing one database handle"""
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.interviews = InterviewRepository(db)
+        self.questions = QuestionRepository(db)
+        self.evaluations = EvaluationRepository(db)
+        self.idempotency = IdempotencyRepository(db)
@@ -0,0 +1,247 @@
+"""
+Output schemas for the three agents
+- Pydantic models for generated questions, answer analysis and the final report
+- Local repair while validating: "85/100" -> 85, ranges clamped, enum synonyms
+  mapped, missing optional fields defaulted, single strings wrapped as lists
+- validate_output() reports why repair failed, for a single corrective re-ask
+"""
+
+import re
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError, field_validator, model_validator
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+
+
+def coerce_score(value: Any) -> Any:
+    """Scores as the model writes them ("85", "85/100", "8.5/10", "85%", 0.85) -> int in 0..100"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        numbers = _NUMBER.findall(value)
+        if not numbers:
+            return value
+        score = float(numbers[0])
+        if "/" in value and len(numbers) > 1 and float(numbers[1]) > 0:
+            score = 100 * score / float(numbers[1])
+        value = score
+    if isinstance(value, (int, float)):
+        if 0 < value <= 1 and not float(value).is_integer():
+            value = value * 100
+        return int(round(min(100, max(0, value))))
+    return value
+
+
+def coerce_list(value: Any) -> Any:
+    """A single string (or nothing) where a list of strings is expected"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(v) for v in value if v is not None and str(v).strip()]
+    return value
+
+
+def coerce_choice(value: Any, choices: Tuple[str, ...], synonyms: Dict[str, str], default: str) -> str:
+    if not isinstance(value, str):
+        return default
+    key = re.sub(r"[\s_]+", "-", value.strip().lower())
+    key = synonyms.get(key, key)
+    return key if key in choices else default
+
+
+QUALITY_LEVELS = ("poor", "adequate", "good", "excellent")
+DEPTH_LEVELS = ("superficial", "adequate", "good", "deep")
+DIFFICULTIES = ("easy", "medium", "hard")
+RECOMMENDATIONS = ("strong-hire", "hire", "maybe", "no-hire")
+
+_QUALITY_SYNONYMS = {"weak": "poor", "bad": "poor", "fair": "adequate", "average": "adequate",
+                     "ok": "adequate", "strong": "good", "very-good": "excellent", "outstanding": "excellent"}
+_DEPTH_SYNONYMS = {"shallow": "superficial", "basic": "superficial", "moderate": "adequate",
+                   "solid": "good", "strong": "good", "excellent": "deep", "expert": "deep"}
+_DIFFICULTY_SYNONYMS = {"beginner": "easy", "intermediate": "medium", "advanced": "hard", "difficult": "hard"}
+_RECOMMENDATION_SYNONYMS = {"stronghire": "strong-hire", "strong-yes": "strong-hire", "yes": "hire",
+                            "lean-hire": "maybe", "borderline": "maybe", "nohire": "no-hire",
+                            "no": "no-hire", "reject": "no-hire", "do-not-hire": "no-hire"}
+
+
+def recommendation_for_score(score: int) -> str:
+    """Same thresholds as the mock report"""
+    if score >= 85:
+        return "strong-hire"
+    if score >= 70:
+        return "hire"
+    if score >= 55:
+        return "maybe"
+    return "no-hire"
+
+
+class GeneratedQuestion(BaseModel):
+    id: str = ""
+    number: int = 0
+    question: str
+    skill_tested: str = "General"
+    difficulty: str = "medium"
+    category: str = ""
+    expected_key_points: List[str] = []
+    why_this_question: str = ""
+    follow_up_prompt: str = ""
+
+    @field_validator("question")
+    @classmethod
+    def _question_text(cls, v: str) -> str:
+        v = v.strip()
+        if len(v) < 10:
+            raise ValueError("question text is missing or too short")
+        return v
+
+    @field_validator("number", mode="before")
+    @classmethod
+    def _number(cls, v: Any) -> Any:
+        if isinstance(v, str):
+            numbers = _NUMBER.findall(v)
+            return int(float(numbers[0])) if numbers else 0
+        return v if v is not None else 0
+
+    @field_validator("id", "skill_tested", "category", "why_this_question", "follow_up_prompt", mode="before")
+    @classmethod
+    def _text(cls, v: Any) -> Any:
+        return "" if v is None else str(v)
+
+    @field_validator("difficulty", mode="before")
+    @classmethod
+    def _difficulty(cls, v: Any) -> str:
+        return coerce_choice(v, DIFFICULTIES, _DIFFICULTY_SYNONYMS, "medium")
+
+    @field_validator("expected_key_points", mode="before")
+    @classmethod
+    def _lists(cls, v: Any) -> Any:
+        return coerce_list(v)
+
+    @model_validator(mode="after")
+    def _defaults(self) -> "GeneratedQuestion":
+        if not self.skill_tested:
+            self.skill_tested = "General"
+        return self
+
+
+class AnswerAnalysis(BaseModel):
+    overall_score: int
+    key_points_covered: List[str] = []
+    missing_points: List[str] = []
+    communication_quality: str = "adequate"
+    technical_accuracy: str = "adequate"
+    depth_of_knowledge: str = "adequate"
+    feedback_to_candidate: str = ""
+
+    @field_validator("overall_score", mode="before")
+    @classmethod
+    def _score(cls, v: Any) -> Any:
+        return coerce_score(v)
+
+    @field_validator("key_points_covered", "missing_points", mode="before")
+    @classmethod
+    def _lists(cls, v: Any) -> Any:
+        return coerce_list(v)
+
+    @field_validator("communication_quality", "technical_accuracy", mode="before")
+    @classmethod
+    def _quality(cls, v: Any) -> str:
+        return coerce_choice(v, QUALITY_LEVELS, _QUALITY_SYNONYMS, "adequate")
+
+    @field_validator("depth_of_knowledge", mode="before")
+    @classmethod
+    def _depth(cls, v: Any) -> str:
+        return coerce_choice(v, DEPTH_LEVELS, _DEPTH_SYNONYMS, "adequate")
+
+    @field_validator("feedback_to_candidate", mode="before")
+    @classmethod
+    def _feedback(cls, v: Any) -> Any:
+        if isinstance(v, list):
+            return " ".join(str(s) for s in v)
+        return "" if v is None else v
+
+    @model_validator(mode="after")
+    def _default_feedback(self) -> "AnswerAnalysis":
+        if not self.feedback_to_candidate.strip():
+            self.feedback_to_candidate = f"Score: {self.overall_score}/100"
+        return self
+
+
+class InterviewReport(BaseModel):
+    overall_score: int
+    technical_score: Optional[int] = None
+    communication_score: Optional[int] = None
+    cultural_fit_score: Optional[int] = None
+    recommendation: str = ""
+    final_reasoning: str = ""
+    strengths: List[str] = []
+    development_areas: List[str] = []
+    role_fit_assessment: str = ""
+    three_month_plan: List[str] = []
+    next_round_questions: List[str] = []
+
+    @field_validator("overall_score", "technical_score", "communication_score", "cultural_fit_score", mode="before")
+    @classmethod
+    def _scores(cls, v: Any) -> Any:
+        return coerce_score(v)
+
+    @field_validator("recommendation", mode="before")
+    @classmethod
+    def _recommendation(cls, v: Any) -> str:
+        # Unrecognized values are derived from the score below
+        return coerce_choice(v, RECOMMENDATIONS, _RECOMMENDATION_SYNONYMS, "")
+
+    @field_validator("final_reasoning", "role_fit_assessment", mode="before")
+    @classmethod
+    def _text(cls, v: Any) -> Any:
+        if isinstance(v, list):
+            return " ".join(str(s) for s in v)
+        return "" if v is None else v
+
+    @field_validator("strengths", "development_areas", "three_month_plan", "next_round_questions", mode="before")
+    @classmethod
+    def _lists(cls, v: Any) -> Any:
+        return coerce_list(v)
+
+    @model_validator(mode="after")
+    def _defaults(self) -> "InterviewReport":
+        # Sub-scores the model left out fall back to the overall score
+        for field in ("technical_score", "communication_score", "cultural_fit_score"):
+            if getattr(self, field) is None:
+                setattr(self, field, self.overall_score)
+        if not self.recommendation:
+            self.recommendation = recommendation_for_score(self.overall_score)
+        return self
+
+
+def validate_output(schema: Type[BaseModel], data: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Repair and validate one parsed model output -> (clean dict, None) or (None, reason)"""
+    if not isinstance(data, dict):
+        return None, "expected a JSON object"
+    try:
+        return schema.model_validate(data).model_dump(), None
+    except ValidationError as e:
+        reasons = "; ".join(f"{'.'.join(str(p) for p in err['loc']) or 'value'}: {err['msg']}" for err in e.errors())
+        return None, reasons
+
+
+def validate_questions(data: Any, total_questions: int) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+    """Question set output: invalid questions are dropped and the rest renumbered"""
+    items = data.get("questions") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return None, 'expected {"questions": [...]}'
+    questions = []
+    for item in items:
+        question, _ = validate_output(GeneratedQuestion, item)
+        if question is not None:
+            questions.append(question)
+    if not questions:
+        return None, "no usable questions (each needs a question text)"
+    questions = questions[:total_questions]
+    for number, q in enumerate(questions, start=1):
+        q["number"] = number
+        q["id"] = q["id"] or f"q_{number}"
+    return questions, None
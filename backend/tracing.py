@@ -0,0 +1,306 @@
+"""
+Lightweight request tracing
+- One trace per request (or background job), identified by a trace id
+- Spans time the stages inside it: model calls, MongoDB operations, JSON
+  extraction, report building; nested spans record their parent
+- Finished traces go to an exporter (stdout or a JSON-lines file) on a
+  background thread, so exporting never blocks the event loop
+- Clients can opt in to a Server-Timing breakdown of their own request
+- Every response carries X-Trace-Id; uvicorn's log lines are tagged with it
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# "none", "stdout" or "file" (TRACE_EXPORT_FILE)
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none").lower()
+TRACE_EXPORT_FILE = os.getenv("TRACE_EXPORT_FILE", "traces.jsonl")
+TRACE_ID_HEADER = "X-Trace-Id"
+# Request header that asks for a Server-Timing breakdown in the response
+SERVER_TIMING_REQUEST_HEADER = "X-Server-Timing"
+
+
+class Span:
+    __slots__ = ("span_id", "parent_id", "name", "attributes", "start", "duration", "error")
+
+    def __init__(self, name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def end(self):
+        self.duration = time.perf_counter() - self.start
+
+
+class Trace:
+    def __init__(self, name: str, trace_id: Optional[str] = None, **attributes: Any):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.attributes = attributes
+        self.started_at = datetime.utcnow()
+        self.start = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.spans: List[Span] = []
+
+    def end(self):
+        self.duration = time.perf_counter() - self.start
+
+    def timing_by_name(self) -> Dict[str, Dict[str, float]]:
+        """Total milliseconds and count per span name (nested spans are counted on their own)"""
+        totals: Dict[str, Dict[str, float]] = {}
+        for span in self.spans:
+            if span.duration is None:
+                continue
+            entry = totals.setdefault(span.name, {"ms": 0.0, "count": 0})
+            entry["ms"] += span.duration * 1000
+            entry["count"] += 1
+        return totals
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: one metric per span name plus the total so far"""
+        metrics = [f'{name};dur={t["ms"]:.1f};desc="{int(t["count"])}x"'
+                   for name, t in self.timing_by_name().items()]
+        metrics.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "attributes": self.attributes,
+            "started_at": self.started_at.isoformat() + "Z",
+            "duration_ms": round((self.duration or 0) * 1000, 3),
+            "spans": [{
+                "span_id": s.span_id,
+                "parent_id": s.parent_id,
+                "name": s.name,
+                "attributes": s.attributes,
+                "offset_ms": round((s.start - self.start) * 1000, 3),
+                "duration_ms": round(s.duration * 1000, 3) if s.duration is not None else None,
+                **({"error": s.error} if s.error else {}),
+            } for s in self.spans],
+        }
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_trace_id() -> Optional[str]:
+    trace = _current_trace.get()
+    return trace.trace_id if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time a block as a span of the current trace (a no-op outside a trace).
+    Usable around awaits: the parent is tracked per task through contextvars.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = type(e).__name__
+        raise
+    finally:
+        current.end()
+        _current_span.reset(token)
+
+
+def record_span(name: str, start: float, **attributes: Any):
+    """Add an already finished span (start from time.perf_counter()) without making it current.
+    For stages that span several yields of an async generator."""
+    trace = _current_trace.get()
+    if trace is None:
+        return
+    parent = _current_span.get()
+    finished = Span(name, parent.span_id if parent else None, attributes)
+    finished.start = start
+    finished.end()
+    trace.spans.append(finished)
+
+
+def traced_methods(span_name: str):
+    """Class decorator: every public coroutine method runs in a span tagged with its
+    name as the operation and the instance's collection (if any)"""
+    def decorate(cls):
+        for attr, method in list(vars(cls).items()):
+            if attr.startswith("_") or not asyncio.iscoroutinefunction(method):
+                continue
+            setattr(cls, attr, _traced(method, span_name, attr))
+        return cls
+    return decorate
+
+
+def _traced(method, span_name: str, operation: str):
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        parent = _current_span.get()
+        if parent is not None and parent.name == span_name:
+            # e.g. set_fields -> update: time the outer call only
+            return await method(self, *args, **kwargs)
+        collection = getattr(getattr(self, "collection", None), "name", type(self).__name__)
+        with span(span_name, collection=collection, operation=operation):
+            return await method(self, *args, **kwargs)
+    return wrapper
+
+
+# ============================================================
+# Export
+# ============================================================
+
+class TraceExporter:
+    """Writes finished traces as JSON lines from a daemon thread"""
+
+    def __init__(self, destination: str = TRACE_EXPORTER, path: str = TRACE_EXPORT_FILE):
+        self.destination = destination
+        self.path = path
+        self._queue: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self.exported = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.destination in ("stdout", "file")
+
+    def export(self, trace: Trace):
+        if not self.enabled:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+            self._thread.start()
+        self._queue.put(trace.to_dict())
+
+    def _run(self):
+        stream = open(self.path, "a", encoding="utf-8") if self.destination == "file" else sys.stdout
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Write whatever else is queued before flushing once
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            for record in batch:
+                if record is None:
+                    running = False
+                    break
+                stream.write(json.dumps(record, default=str) + "\n")
+                self.exported += 1
+            stream.flush()
+        if stream is not sys.stdout:
+            stream.close()
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+exporter = TraceExporter()
+
+
+@contextmanager
+def start_trace(name: str, trace_id: Optional[str] = None, **attributes: Any) -> Iterator[Trace]:
+    """Make a new trace current for the block and export it when the block ends"""
+    trace = Trace(name, trace_id, **attributes)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        trace.end()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        exporter.export(trace)
+
+
+# ============================================================
+# Request instrumentation
+# ============================================================
+
+class TraceIdLogFilter(logging.Filter):
+    """Prefixes log lines emitted inside a traced request with its trace id"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        trace_id = current_trace_id()
+        record.trace_id = trace_id or "-"
+        if trace_id and not getattr(record, "_trace_tagged", False):
+            if record.name == "uvicorn.access" and isinstance(record.args, tuple) and record.args:
+                # uvicorn's access formatter ignores msg and reads the client address from args
+                record.args = (f"{record.args[0]} [trace {trace_id}]",) + record.args[1:]
+            else:
+                record.msg = f"[trace {trace_id}] {record.msg}"
+            record._trace_tagged = True
+        return True
+
+
+def install_log_filter(logger_names=("uvicorn.access", "uvicorn.error")):
+    for name in logger_names:
+        logging.getLogger(name).addFilter(TraceIdLogFilter())
+
+
+def _valid_trace_id(value: str) -> bool:
+    return 8 <= len(value) <= 64 and all(c in "0123456789abcdefABCDEF-" for c in value)
+
+
+class TracingMiddleware:
+    """
+    Starts a trace per HTTP request. An incoming X-Trace-Id (e.g. from a proxy)
+    is reused so logs can be joined across services. Requests that send
+    X-Server-Timing get a Server-Timing header with the time per span name.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        incoming = headers.get(TRACE_ID_HEADER.lower().encode(), b"").decode("latin-1")
+        want_timing = SERVER_TIMING_REQUEST_HEADER.lower().encode() in headers
+
+        with start_trace(f'{scope["method"]} {scope["path"]}',
+                         trace_id=incoming if _valid_trace_id(incoming) else None,
+                         method=scope["method"], path=scope["path"]) as trace:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    response_headers = list(message.get("headers") or [])
+                    response_headers.append((TRACE_ID_HEADER.encode(), trace.trace_id.encode()))
+                    if want_timing:
+                        response_headers.append((b"server-timing", trace.server_timing().encode()))
+                        response_headers.append((b"timing-allow-origin", b"*"))
+                    message = {**message, "headers": response_headers}
+                    trace.attributes["status"] = message["status"]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
@@ -6,6 +6,7 @@
  */
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
+const SUBMIT_CONFLICT_RETRIES = 30
 
 /**
  * Helper function to handle API responses
@@ -18,8 +19,32 @@ async function handleResponse(response: Response) {
   return response.json()
 }
 
+/**
+ * Random key for the Idempotency-Key header
+ * crypto.randomUUID only exists in secure contexts (HTTPS or localhost), so a
+ * frontend reached over plain HTTP falls back to getRandomValues, which does not
+ */
+export function newIdempotencyKey(): string {
+  if (typeof crypto !== "undefined" && typeof crypto.randomUUID === "function") {
+    return crypto.randomUUID()
+  }
+  const bytes = new Uint8Array(16)
+  if (typeof crypto !== "undefined" && typeof crypto.getRandomValues === "function") {
+    crypto.getRandomValues(bytes)
+  } else {
+    for (let i = 0; i < bytes.length; i++) bytes[i] = Math.floor(Math.random() * 256)
+  }
+  // RFC 4122 version 4 layout
+  bytes[6] = (bytes[6] & 0x0f) | 0x40
+  bytes[8] = (bytes[8] & 0x3f) | 0x80
+  const hex = Array.from(bytes, (b) => b.toString(16).padStart(2, "0")).join("")
+  return `${hex.slice(0, 8)}-${hex.slice(8, 12)}-${hex.slice(12, 16)}-${hex.slice(16, 20)}-${hex.slice(20)}`
+}
+
 /**
  * Create a new interview session
+ * Pass the same idempotencyKey when retrying to get the first interview back
+ * instead of creating another one
  */
 export async function createInterview(data: {
   candidate_name: string
@@ -31,11 +56,14 @@ export async function createInterview(data: {
     experience_years?: number
   }>
   interview_duration_minutes?: number
-}) {
+  // Return immediately; questions are generated in the background
+  stream_questions?: boolean
+}, idempotencyKey?: string) {
   const response = await fetch(`${API_BASE_URL}/api/interviews/create`, {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
+      ...(idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {}),
     },
     body: JSON.stringify(data),
   })
@@ -85,13 +113,55 @@ export async function submitResponse(
   questionId: string,
   answer: string,
   timeTakenSeconds: number
+) {
+  // Every attempt below is the same submit
+  const idempotencyKey = newIdempotencyKey()
+  for (let attempt = 0; ; attempt++) {
+    const response = await fetch(
+      `${API_BASE_URL}/api/interviews/${interviewId}/submit-answer`,
+      {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "Idempotency-Key": idempotencyKey,
+        },
+        body: JSON.stringify({
+          question_id: questionId,
+          answer: answer,
+          time_taken_seconds: timeTakenSeconds,
+        }),
+      }
+    )
+
+    // 409 with Retry-After: an earlier submit of this answer is still being
+    // analyzed; once it is stored, resubmitting returns its analysis
+    if (response.status === 409 && response.headers.has("Retry-After") && attempt < SUBMIT_CONFLICT_RETRIES) {
+      await new Promise((resolve) => setTimeout(resolve, 1000))
+      continue
+    }
+    return handleResponse(response)
+  }
+}
+
+/**
+ * Submit an answer and stream feedback as it is generated (Server-Sent Events)
+ * Calls onToken for each chunk of model output and resolves with the same
+ * body submitResponse returns, once the answer has been stored.
+ */
+export async function submitResponseStream(
+  interviewId: string,
+  questionId: string,
+  answer: string,
+  timeTakenSeconds: number,
+  onToken: (text: string) => void
 ) {
   const response = await fetch(
-    `${API_BASE_URL}/api/interviews/${interviewId}/submit-answer`,
+    `${API_BASE_URL}/api/interviews/${interviewId}/submit-answer/stream`,
     {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        Accept: "text/event-stream",
       },
       body: JSON.stringify({
         question_id: questionId,
@@ -100,8 +170,42 @@ export async function submitResponse(
       }),
     }
   )
-  
-  return handleResponse(response)
+
+  if (!response.ok || !response.body) {
+    return handleResponse(response)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+  let result: any = null
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf("\n\n")
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf("\n\n")
+
+      const eventName = rawEvent.match(/^event: (.*)$/m)?.[1]
+      const data = JSON.parse(rawEvent.match(/^data: (.*)$/m)?.[1] || "{}")
+
+      if (eventName === "token") {
+        onToken(data.text)
+      } else if (eventName === "analysis") {
+        result = data
+      } else if (eventName === "error") {
+        throw new Error(data.detail || "Failed to analyze answer")
+      }
+    }
+  }
+
+  return result
 }
 
 /**
@@ -139,9 +243,12 @@ export async function getEvaluation(interviewId: string) {
 }
 
 /**
- * Check if evaluation exists
+ * Evaluation state: whether it exists and the report_status
+ * (not_started / pending / running / done / failed / unknown)
  */
-export async function hasEvaluation(interviewId: string): Promise<boolean> {
+export async function getEvaluationStatus(
+  interviewId: string
+): Promise<{ exists: boolean; report_status: string }> {
   try {
     const response = await fetch(
       `${API_BASE_URL}/api/interviews/${interviewId}/evaluation/exists`,
@@ -152,15 +259,22 @@ export async function hasEvaluation(interviewId: string): Promise<boolean> {
         },
       }
     )
-    
-    const data = await handleResponse(response)
-    return data.exists
+
+    return await handleResponse(response)
   } catch (error) {
-    console.error("Error checking evaluation existence:", error)
-    return false
+    console.error("Error checking evaluation status:", error)
+    return { exists: false, report_status: "unknown" }
   }
 }
 
+/**
+ * Check if evaluation exists
+ */
+export async function hasEvaluation(interviewId: string): Promise<boolean> {
+  const status = await getEvaluationStatus(interviewId)
+  return status.exists
+}
+
 /**
  * Health check
  */
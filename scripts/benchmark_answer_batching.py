@@ -0,0 +1,115 @@
+"""
+Answer Analysis Batching Benchmark
+Runs many concurrent answer analyses through Agentic_AnswerAnalyzer, once with
+one model call per answer and once with micro-batching, against a fake model
+whose latency grows with prompt size. Reports throughput and model calls.
+
+Usage:
+    python scripts/benchmark_answer_batching.py
+    python scripts/benchmark_answer_batching.py --answers 200 --llm-concurrency 4 --drop-rate 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeAnalysisModel:
+    """Latency = base + per item; batch replies may drop items at drop_rate"""
+
+    def __init__(self, base_ms, per_item_ms, drop_rate, seed=7):
+        self.base_seconds = base_ms / 1000
+        self.per_item_seconds = per_item_ms / 1000
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    @staticmethod
+    def _analysis(score):
+        return {
+            "overall_score": score,
+            "key_points_covered": ["caching"],
+            "missing_points": ["invalidation"],
+            "communication_quality": "good",
+            "technical_accuracy": "good",
+            "depth_of_knowledge": "adequate",
+            "feedback_to_candidate": "Clear answer; discuss invalidation next time."
+        }
+
+    async def generate_content_async(self, prompt, stream=False):
+        self.calls += 1
+        indexes = [int(i) for i in re.findall(r"^### ITEM (\d+)$", prompt, re.MULTILINE)]
+        await asyncio.sleep(self.base_seconds + self.per_item_seconds * max(1, len(indexes)))
+        if not indexes:
+            return FakeResponse(json.dumps(self._analysis(75)))
+        analyses = [{"index": i, **self._analysis(60 + i)} for i in indexes
+                    if self.random.random() >= self.drop_rate]
+        return FakeResponse(json.dumps({"analyses": analyses}))
+
+
+async def run_mode(main, batched, args):
+    from model_providers import FakeProvider
+
+    model = FakeAnalysisModel(args.base_ms, args.per_item_ms, args.drop_rate)
+    # The analyzer takes its model from the provider when it is created
+    main.model_provider = FakeProvider(model)
+    analyzer = main.Agentic_AnswerAnalyzer(batch_enabled=batched)
+
+    async def one(i):
+        return await analyzer.analyze_single_answer(
+            question_text=f"How would you cache responses for service {i}?",
+            answer_text=f"Answer {i}: an LRU cache with a TTL in front of the service.",
+            expected_key_points=["LRU", "TTL", "invalidation"],
+            skill_tested="System Design",
+            difficulty="medium"
+        )
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(args.answers)))
+    elapsed = time.perf_counter() - started
+    valid = sum(1 for r in results if isinstance(r.get("overall_score"), int))
+    batches = analyzer.batcher.stats() if analyzer.batcher else None
+    return elapsed, model.calls, valid, batches
+
+
+async def main_async(args):
+    os.environ.setdefault("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "200")
+    # Exercise the model path (not development mode's mock data) with the fake model below
+    os.environ["MODEL_PROVIDER"] = "fake"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import main
+
+    # No caching between runs
+    main.response_cache.enabled = False
+    main.llm_limiter.max_concurrency = args.llm_concurrency
+    main.llm_limiter._semaphore = None
+
+    print(f"{args.answers} answers, LLM concurrency {args.llm_concurrency}, "
+          f"latency {args.base_ms:.0f}ms + {args.per_item_ms:.0f}ms/item, drop rate {args.drop_rate}\n")
+    print(f"{'mode':<10} {'seconds':>8} {'answers/s':>10} {'model calls':>12} {'valid':>7} {'avg batch':>10}")
+    for batched in (False, True):
+        elapsed, calls, valid, batches = await run_mode(main, batched, args)
+        print(f"{'batched' if batched else 'single':<10} {elapsed:>8.2f} {args.answers / elapsed:>10.1f} "
+              f"{calls:>12} {valid:>7} {batches['avg_batch_size'] if batches else 1:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=64)
+    parser.add_argument("--llm-concurrency", type=int, default=4)
+    parser.add_argument("--base-ms", type=float, default=400, help="fixed latency per model call")
+    parser.add_argument("--per-item-ms", type=float, default=40, help="extra latency per analyzed item")
+    parser.add_argument("--drop-rate", type=float, default=0.05, help="chance a batched item is missing")
+    asyncio.run(main_async(parser.parse_args()))
@@ -0,0 +1,305 @@
+"""
+Interview API Load Benchmark
+Drives complete interview lifecycles (create -> next-question/submit-answer for
+every question -> complete -> evaluation) through the FastAPI app in-process,
+with the fake model provider (backend/model_providers.py): configurable base
+latency, jitter and a schedule of malformed, slow or failing replies. Runs each
+concurrency level in turn and reports throughput, p50/p95/p99 latency per
+endpoint and how throughput scales with concurrency.
+
+Requests go through the full ASGI stack (middleware included) without a socket,
+so the numbers cover the app, storage and model path but not the network.
+
+Usage:
+    python scripts/benchmark_interview_api.py
+    python scripts/benchmark_interview_api.py --concurrency 1,8,32 --lifecycles 64 --llm-latency-ms 300
+    python scripts/benchmark_interview_api.py --storage mongo          # MONGODB_URI, default localhost
+    python scripts/benchmark_interview_api.py --llm-schedule "ok*8,truncated,ok*8,error"
+    python scripts/benchmark_interview_api.py --output bench.json
+    python scripts/benchmark_interview_api.py --baseline bench.json    # exit 1 on a regression
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+SKILLS = [
+    [{"skill_name": "Python", "proficiency_level": "intermediate"}],
+    [{"skill_name": "React", "proficiency_level": "advanced"}, {"skill_name": "TypeScript", "proficiency_level": "intermediate"}],
+    [{"skill_name": "System Design", "proficiency_level": "advanced"}],
+    [{"skill_name": "SQL", "proficiency_level": "beginner"}, {"skill_name": "Python", "proficiency_level": "advanced"}],
+]
+ROLES = ["Backend Developer", "Frontend Developer", "Full Stack Developer", "Data Engineer"]
+
+# Latency differences below this are noise, whatever the ratio
+REGRESSION_NOISE_FLOOR_MS = 5.0
+
+
+async def call_app(app, method, path, body=None):
+    """One request through the ASGI app -> (status, parsed JSON body)"""
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 0), "server": ("benchmark", 80),
+        "headers": [(b"host", b"benchmark"), (b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())],
+    }
+    request_sent = False
+    response_complete = asyncio.Event()
+    status = 500
+    chunks = []
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": payload, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    await app(scope, receive, send)
+    raw = b"".join(chunks)
+    try:
+        return status, json.loads(raw) if raw else None
+    except ValueError:
+        return status, None
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def request(self, app, endpoint, method, path, body=None):
+        started = time.perf_counter()
+        status, data = await call_app(app, method, path, body)
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if status >= 400:
+            self.errors[endpoint] += 1
+        return status, data
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+async def run_lifecycle(app, recorder, n, stream_questions):
+    """One interview from create to evaluation; returns an error string or None"""
+    status, created = await recorder.request(app, "POST create", "POST", "/api/interviews/create", {
+        "candidate_name": f"Benchmark {n}",
+        "role": ROLES[n % len(ROLES)],
+        "experience": "3 years",
+        "selected_skills": SKILLS[n % len(SKILLS)],
+        "stream_questions": stream_questions,
+    })
+    if status != 200:
+        return f"create: {status}"
+    base = f"/api/interviews/{created['interview_id']}"
+
+    for _ in range(created.get("total_questions", 8) + 1):
+        status, question = await recorder.request(app, "GET next-question", "GET", f"{base}/next-question")
+        if status != 200:
+            return f"next-question: {status}"
+        if question["completed"]:
+            break
+        status, _ = await recorder.request(app, "POST submit-answer", "POST", f"{base}/submit-answer", {
+            "question_id": question["question_id"],
+            # Distinct answers so analyses aren't served from the response cache
+            "answer": f"Interview {n}, question {question['question_number']}: a token bucket per client "
+                      f"kept in a shared store, failing open if the store is unreachable.",
+            "time_taken_seconds": 30,
+        })
+        if status != 200:
+            return f"submit-answer: {status}"
+
+    status, completed = await recorder.request(app, "POST complete", "POST", f"{base}/complete")
+    if status != 200:
+        return f"complete: {status}"
+    if completed.get("report") is None:
+        # Report still being generated (REPORT_WAIT_TIMEOUT_SECONDS): poll like the frontend does
+        for _ in range(600):
+            status, state = await recorder.request(app, "GET evaluation/exists", "GET", f"{base}/evaluation/exists")
+            if status == 200 and state.get("report_status") in ("done", "failed"):
+                break
+            await asyncio.sleep(0.1)
+
+    status, _ = await recorder.request(app, "GET evaluation", "GET", f"{base}/evaluation")
+    if status != 200:
+        return f"evaluation: {status}"
+    return None
+
+
+async def run_level(app, concurrency, lifecycles, stream_questions, offset):
+    """lifecycles interviews with at most concurrency of them in progress at once"""
+    recorder = Recorder()
+    failures = []
+    next_index = iter(range(offset, offset + lifecycles))
+
+    async def worker():
+        for n in next_index:
+            error = await run_lifecycle(app, recorder, n, stream_questions)
+            if error:
+                failures.append(error)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    endpoints = {}
+    for endpoint, values in sorted(recorder.latencies.items()):
+        values.sort()
+        endpoints[endpoint] = {
+            "count": len(values),
+            "errors": recorder.errors[endpoint],
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+        }
+    requests = sum(e["count"] for e in endpoints.values())
+    return {
+        "concurrency": concurrency,
+        "lifecycles": lifecycles,
+        "failed_lifecycles": len(failures),
+        "failures": sorted(set(failures)),
+        "seconds": round(elapsed, 3),
+        "lifecycles_per_second": round(lifecycles / elapsed, 2),
+        "requests_per_second": round(requests / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+def print_report(levels):
+    print(f"\n{'concurrency':>11} {'lifecycles/s':>13} {'requests/s':>11} {'failed':>7} {'speedup':>8} {'efficiency':>11}")
+    base = levels[0]
+    for level in levels:
+        speedup = level["lifecycles_per_second"] / base["lifecycles_per_second"]
+        efficiency = speedup / (level["concurrency"] / base["concurrency"])
+        print(f"{level['concurrency']:>11} {level['lifecycles_per_second']:>13.2f} {level['requests_per_second']:>11.1f} "
+              f"{level['failed_lifecycles']:>7} {speedup:>7.1f}x {efficiency:>10.0%}")
+
+    for level in levels:
+        print(f"\nconcurrency {level['concurrency']} ({level['lifecycles']} lifecycles in {level['seconds']:.2f}s)")
+        print(f"  {'endpoint':<24} {'count':>6} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for endpoint, stats in level["endpoints"].items():
+            print(f"  {endpoint:<24} {stats['count']:>6} {stats['errors']:>7} "
+                  f"{stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+        for failure in level["failures"]:
+            print(f"  ❌ {failure}")
+
+
+def find_regressions(levels, baseline, max_regression):
+    """Throughput drops and p95 increases beyond max_regression vs. a previous --output file"""
+    previous = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    problems = []
+    for level in levels:
+        before = previous.get(level["concurrency"])
+        if before is None:
+            continue
+        if level["lifecycles_per_second"] < before["lifecycles_per_second"] * (1 - max_regression):
+            problems.append(f"concurrency {level['concurrency']}: {level['lifecycles_per_second']} lifecycles/s, "
+                            f"was {before['lifecycles_per_second']}")
+        for endpoint, stats in level["endpoints"].items():
+            old = before["endpoints"].get(endpoint)
+            if old is None:
+                continue
+            if (stats["p95_ms"] > old["p95_ms"] * (1 + max_regression)
+                    and stats["p95_ms"] - old["p95_ms"] > REGRESSION_NOISE_FLOOR_MS):
+                problems.append(f"concurrency {level['concurrency']}, {endpoint}: p95 {stats['p95_ms']}ms, "
+                                f"was {old['p95_ms']}ms")
+    return problems
+
+
+async def main_async(args):
+    os.environ["STORAGE_BACKEND"] = args.storage
+    os.environ["MODEL_PROVIDER"] = "fake"
+    os.environ["FAKE_LLM_LATENCY_MS"] = str(args.llm_latency_ms)
+    os.environ["FAKE_LLM_JITTER_MS"] = str(args.llm_jitter_ms)
+    os.environ["FAKE_LLM_SLOW_MS"] = str(args.llm_slow_ms)
+    os.environ["FAKE_LLM_SCHEDULE"] = args.llm_schedule
+    os.environ["FAKE_LLM_SEED"] = str(args.seed)
+    os.environ.setdefault("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "2000")
+    # Request logs would drown out the report
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    import main
+
+    main.llm_limiter.max_concurrency = args.llm_concurrency
+    main.llm_limiter._semaphore = None
+
+    levels = []
+    async with main.lifespan(main.app):
+        if args.storage == "mongo" and await main.get_database() is None:
+            print(f"❌ MongoDB not reachable at {main.mongo.uri}")
+            sys.exit(1)
+        print(f"storage {args.storage}, model latency {args.llm_latency_ms:.0f}ms + up to {args.llm_jitter_ms:.0f}ms "
+              f"jitter, schedule {args.llm_schedule!r}, LLM concurrency {args.llm_concurrency}, "
+              f"{args.lifecycles} lifecycles per level")
+        # Warm-up: imports, indexes, first question bank refills
+        await run_level(main.app, 1, 1, args.stream_questions, offset=0)
+        offset = 1
+        for concurrency in args.concurrency:
+            levels.append(await run_level(main.app, concurrency, max(args.lifecycles, concurrency),
+                                          args.stream_questions, offset))
+            offset += levels[-1]["lifecycles"]
+            print(f"  concurrency {concurrency}: {levels[-1]['lifecycles_per_second']:.2f} lifecycles/s")
+
+    print_report(levels)
+    model = main.model_provider.stats()
+    print(f"\nmodel calls: {model['calls']} {model['outcomes']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+                       "levels": levels}, f, indent=2)
+        print(f"results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            problems = find_regressions(levels, json.load(f), args.max_regression)
+        for p in problems:
+            print(f"❌ regression: {p}")
+        if problems:
+            sys.exit(1)
+        print(f"✅ no regression beyond {args.max_regression:.0%} against {args.baseline}")
+    if any(level["failed_lifecycles"] for level in levels):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--storage", choices=("memory", "mongo"), default="memory")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16, 64],
+                        help="comma-separated interviews in progress at once, one run per value")
+    parser.add_argument("--lifecycles", type=int, default=64, help="interviews per concurrency level")
+    parser.add_argument("--llm-latency-ms", type=float, default=200, help="base latency per model call")
+    parser.add_argument("--llm-jitter-ms", type=float, default=100, help="extra random latency, 0..jitter")
+    parser.add_argument("--llm-slow-ms", type=float, default=5000, help="extra latency of scheduled slow calls")
+    parser.add_argument("--llm-schedule", default="ok",
+                        help="fake model outcomes per call, repeated, e.g. ok*8,fenced,truncated,slow,error")
+    parser.add_argument("--llm-concurrency", type=int, default=8)
+    parser.add_argument("--stream-questions", action="store_true", help="create interviews with streamed questions")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON (usable as a later --baseline)")
+    parser.add_argument("--baseline", help="results JSON from an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="allowed throughput drop / p95 increase vs. the baseline")
+    asyncio.run(main_async(parser.parse_args()))
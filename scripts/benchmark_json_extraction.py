@@ -0,0 +1,198 @@
+"""
+JSON Extraction Benchmark
+Compares the incremental extractor (backend/json_stream.py) with the previous
+extract_json_from_text on a corpus of model outputs: parse success rate and throughput.
+
+Usage:
+    python scripts/benchmark_json_extraction.py
+    python scripts/benchmark_json_extraction.py --corpus outputs.jsonl --rounds 50
+
+A corpus file has one JSON object per line: {"text": "<raw model output>", "schema": "questions|analysis|report"}
+(success = the agent's schema accepts it) or {"text": ..., "expect": "<top-level key>"}.
+Without --corpus, each agent's output from the fake model provider is used in the
+shapes seen from real models (fenced, prose, trailing commas, truncated, ...).
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend"))
+
+from json_stream import JsonExtractor, extract_json  # noqa: E402
+from model_providers import FakeModel  # noqa: E402
+from schemas import AnswerAnalysis, InterviewReport, validate_output, validate_questions  # noqa: E402
+
+
+def legacy_extract_json_from_text(text):
+    """extract_json_from_text as it was before the incremental extractor"""
+    if not text:
+        return None
+
+    for start_char in ('{', '['):
+        start_idx = text.find(start_char)
+        if start_idx == -1:
+            continue
+
+        stack = []
+        for i in range(start_idx, len(text)):
+            ch = text[i]
+            if ch in '{[':
+                stack.append(ch)
+            elif ch in '}]':
+                if not stack:
+                    break
+                open_ch = stack.pop()
+                if (open_ch == '{' and ch != '}') or (open_ch == '[' and ch != ']'):
+                    break
+                if not stack:
+                    candidate = text[start_idx:i+1]
+                    return candidate
+
+    m = re.search(r"\{(?:[^{}]|(?R))*\}", text, re.DOTALL)
+    if m:
+        return m.group(0)
+
+    return None
+
+
+def legacy_parse(text):
+    try:
+        json_sub = legacy_extract_json_from_text(text)
+        if not json_sub:
+            return None
+        return json.loads(json_sub)
+    except Exception:
+        return None
+
+
+def streamed_parse(text, chunk_size=40):
+    extractor = JsonExtractor()
+    for i in range(0, len(text), chunk_size):
+        if extractor.feed(text[i:i + chunk_size]):
+            break
+    return extractor.finish()
+
+
+# ---------------- Built-in corpus ----------------
+
+# Prompts the fake provider answers in each agent's output schema (see FakeModel.reply)
+AGENT_PROMPTS = {
+    "questions": 'Return {"questions": [...]}\nTotal questions: 8\n'
+                 'Skills to assess: Python (advanced), System Design (intermediate)',
+    "analysis": "Analyze this answer to an interview question.",
+    "report": "You are a hiring manager.\nAverage answer score: 78",
+}
+
+# Parsed output counts as a success only if the agent would accept it
+SCHEMA_CHECKS = {
+    "questions": lambda parsed: validate_questions(parsed, 8)[0] is not None,
+    "analysis": lambda parsed: validate_output(AnswerAnalysis, parsed)[0] is not None,
+    "report": lambda parsed: validate_output(InterviewReport, parsed)[0] is not None,
+}
+
+
+def _payload(schema):
+    """GeneratedQuestion / AnswerAnalysis / InterviewReport output, with braces in prose like real replies"""
+    payload = FakeModel().reply(AGENT_PROMPTS[schema])
+    if schema == "questions":
+        payload["questions"][0]["question"] += " Consider {keys} and [eviction]."
+    elif schema == "analysis":
+        payload["feedback_to_candidate"] += " Mostly {solid}; see [notes]."
+    else:
+        payload["final_reasoning"] += " Scores {technical, communication} are in [0, 100]."
+    return payload
+
+
+def _with_trailing_commas(text):
+    return text.replace("]", ",]").replace("}", ",}").replace("[,]", "[]").replace("{,}", "{}")
+
+
+def builtin_corpus():
+    corpus = []
+    for schema in SCHEMA_CHECKS:
+        payload = _payload(schema)
+        pretty = json.dumps(payload, indent=2)
+        compact = json.dumps(payload)
+        shapes = {
+            "clean": pretty,
+            "compact": compact,
+            "fenced": f"```json\n{pretty}\n```",
+            "prose": f"Sure! Here is the evaluation you asked for:\n\n{pretty}\n\nLet me know if you need more.",
+            "prose_with_braces": f"Using the {{format}} [requested]:\n{pretty}",
+            "trailing_commas": _with_trailing_commas(pretty),
+            "fenced_trailing_commas": f"```json\n{_with_trailing_commas(pretty)}\n```",
+            "truncated": pretty[: int(len(pretty) * 0.8)],
+            "truncated_in_string": compact[: compact.rfind('"') - 3],
+        }
+        for shape, text in shapes.items():
+            corpus.append({"shape": f"{schema}/{shape}", "text": text, "schema": schema, "expect": None})
+    return corpus
+
+
+def load_corpus(path):
+    corpus = []
+    with open(path, encoding="utf-8") as f:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if line:
+                entry = json.loads(line)
+                corpus.append({"shape": entry.get("shape", f"line {n}"), "text": entry["text"],
+                               "schema": entry.get("schema"), "expect": entry.get("expect")})
+    return corpus
+
+
+# ---------------- Benchmark ----------------
+
+def succeeded(parsed, entry):
+    if entry.get("schema"):
+        return SCHEMA_CHECKS[entry["schema"]](parsed)
+    if not isinstance(parsed, dict):
+        return False
+    return entry["expect"] is None or entry["expect"] in parsed
+
+
+def run(corpus, rounds):
+    parsers = (
+        ("legacy extract_json_from_text", legacy_parse),
+        ("extract_json", extract_json),
+        ("JsonExtractor (40-char chunks)", streamed_parse),
+    )
+    total_bytes = sum(len(entry["text"]) for entry in corpus)
+
+    print(f"Corpus: {len(corpus)} outputs, {total_bytes / 1024:.1f} KiB, {rounds} rounds\n")
+    print(f"{'parser':<34} {'success':>9} {'MiB/s':>8} {'outputs/s':>11}")
+    failures = {}
+    for name, parse in parsers:
+        ok = 0
+        failures[name] = []
+        for entry in corpus:
+            if succeeded(parse(entry["text"]), entry):
+                ok += 1
+            else:
+                failures[name].append(entry["shape"])
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for entry in corpus:
+                parse(entry["text"])
+        elapsed = time.perf_counter() - started
+
+        print(f"{name:<34} {ok:>4}/{len(corpus):<4} {total_bytes * rounds / elapsed / 2**20:>8.2f} "
+              f"{len(corpus) * rounds / elapsed:>11.0f}")
+
+    for name, failed in failures.items():
+        if failed:
+            print(f"\n{name} failed on: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--corpus", help="JSONL file of captured model outputs")
+    parser.add_argument("--rounds", type=int, default=20, help="timing rounds over the corpus")
+    args = parser.parse_args()
+
+    run(load_corpus(args.corpus) if args.corpus else builtin_corpus(), args.rounds)
@@ -0,0 +1,103 @@
+"""
+Multi-Worker Consistency Check
+Runs interviews against a backend started with several workers and fires
+concurrent duplicate next-question calls and submits for every question. Each
+connection is new, so requests spread across worker processes. Verifies that
+duplicates see the same question, exactly one submit per question is stored
+and progress never skips or double-advances.
+
+Usage (backend running with MongoDB and WEB_CONCURRENCY > 1):
+    python scripts/check_multi_worker.py
+    python scripts/check_multi_worker.py --url http://localhost:8000 --interviews 4 --duplicates 6
+"""
+
+import argparse
+import json
+import sys
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def request(url, method="GET", body=None):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            return response.status, json.loads(response.read() or b"{}")
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read() or b"{}")
+
+
+def run_interview(base, duplicates, n):
+    status, created = request(f"{base}/api/interviews/create", "POST", {
+        "candidate_name": f"Worker Check {n}",
+        "role": "Backend Developer",
+        "experience": "3 years",
+        "selected_skills": [{"skill_name": "Python", "proficiency_level": "intermediate"}],
+    })
+    if status != 200:
+        return [f"create failed: {status} {created}"]
+    interview_id = created["interview_id"]
+    problems = []
+    seen_questions = set()
+
+    with ThreadPoolExecutor(max_workers=duplicates) as pool:
+        while True:
+            # Repeated next-question calls must all serve the same question
+            url = f"{base}/api/interviews/{interview_id}/next-question"
+            served = list(pool.map(lambda _: request(url), range(duplicates)))
+            status, question = served[0]
+            if any(s != 200 for s, _ in served):
+                problems.append(f"next-question failed: {[s for s, _ in served]} {question}")
+                break
+            if len({q["question_id"] for _, q in served}) > 1:
+                problems.append(f"concurrent next-question served different questions: "
+                                f"{sorted({q['question_id'] for _, q in served})}")
+                break
+            if question["completed"]:
+                break
+            if question["question_id"] in seen_questions:
+                problems.append(f"question {question['question_id']} served again after being answered")
+                break
+            seen_questions.add(question["question_id"])
+
+            body = {"question_id": question["question_id"], "answer": "Use an LRU cache with a TTL.",
+                    "time_taken_seconds": 5}
+            url = f"{base}/api/interviews/{interview_id}/submit-answer"
+            statuses = list(pool.map(lambda _: request(url, "POST", body)[0], range(duplicates)))
+            if statuses.count(200) < 1 or any(s not in (200, 409) for s in statuses):
+                problems.append(f"question {question['number']}: unexpected submit statuses {statuses}")
+
+    status, interview = request(f"{base}/api/interviews/{interview_id}")
+    if status == 200 and interview.get("current_question") != len(seen_questions):
+        problems.append(f"current_question is {interview.get('current_question')}, "
+                        f"expected {len(seen_questions)}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--interviews", type=int, default=4, help="interviews run in parallel")
+    parser.add_argument("--duplicates", type=int, default=4, help="concurrent submits per question")
+    args = parser.parse_args()
+
+    status, health = request(f"{args.url}/api/health")
+    if status != 200 or health.get("database") != "connected":
+        print(f"❌ Backend must be running with MongoDB connected (health: {health})")
+        sys.exit(1)
+
+    with ThreadPoolExecutor(max_workers=args.interviews) as pool:
+        results = list(pool.map(lambda n: run_interview(args.url, args.duplicates, n), range(args.interviews)))
+
+    problems = [p for result in results for p in result]
+    for p in problems:
+        print(f"❌ {p}")
+    if problems:
+        sys.exit(1)
+    print(f"✅ {args.interviews} interviews consistent under {args.duplicates} concurrent submits per question")
+
+
+if __name__ == "__main__":
+    main()
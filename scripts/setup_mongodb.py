@@ -6,11 +6,33 @@ Creates collections and indexes for the AI Interview Assistant
 from pymongo import MongoClient, ASCENDING, DESCENDING
 from datetime import datetime
 import os
+import sys
 
 # MongoDB connection
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "ai_interviews"
 
+def upgrade_unique_index(collection, name, key, newest_by, old_names):
+    """Prepare an existing collection for a unique index on key (see backend/database.py)"""
+    existing = collection.index_information()
+    if name in existing:
+        return
+    pipeline = [
+        {"$sort": {newest_by: DESCENDING}},
+        {"$group": {"_id": f"${key}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    removed = 0
+    for group in collection.aggregate(pipeline, allowDiskUse=True):
+        removed += collection.delete_many({"_id": {"$in": group["ids"][1:]}}).deleted_count
+    if removed:
+        print(f"Removed {removed} duplicate documents from {collection.name} before creating {name}")
+    for old_name in old_names:
+        if old_name in existing:
+            collection.drop_index(old_name)
+            print(f"Dropped index on {collection.name}: {old_name} (replaced by {name})")
+
+
 def setup_database():
     """Initialize MongoDB collections and indexes"""
     client = MongoClient(MONGODB_URL)
@@ -43,12 +65,30 @@ def setup_database():
         },
         "evaluations": {
             "indexes": [
-                ("interview_id", ASCENDING),
                 ("created_at", DESCENDING)
             ]
         }
     }
+
+    # Indexes backing the backend's per-interview lookups (the API also
+    # ensures these on startup; names must match backend/database.py)
+    lookup_indexes = {
+        "interviews": [
+            ([("interview_id", ASCENDING)], {"unique": True, "name": "interview_id_unique"}),
+        ],
+        "questions": [
+            ([("interview_id", ASCENDING), ("number", ASCENDING)], {"name": "interview_id_number"}),
+            ([("interview_id", ASCENDING), ("question_id", ASCENDING)], {"name": "interview_id_question_id"}),
+        ],
+        "evaluations": [
+            ([("interview_id", ASCENDING)], {"unique": True, "name": "interview_id_unique"}),
+        ],
+    }
     
+    # Earlier versions created a non-unique evaluations.interview_id index;
+    # remove duplicate reports (keeping the newest) and that index first
+    upgrade_unique_index(db["evaluations"], "interview_id_unique", "interview_id", "generated_at", ["interview_id_1"])
+
     # Create collections and indexes
     for collection_name, config in collections.items():
         if collection_name not in db.list_collection_names():
@@ -59,6 +99,10 @@ def setup_database():
         for index in config["indexes"]:
             collection.create_index([index])
             print(f"Created index on {collection_name}: {index[0]}")
+
+        for keys, options in lookup_indexes.get(collection_name, []):
+            collection.create_index(keys, **options)
+            print(f"Created index on {collection_name}: {options['name']}")
     
     # Seed sample questions
     questions_collection = db["questions"]
@@ -127,5 +171,60 @@ def setup_database():
     print("Database setup complete!")
     client.close()
 
+
+def _plan_stages(plan):
+    """Yield every stage name in a query plan tree"""
+    yield plan.get("stage")
+    for child_key in ("inputStage", "queryPlan"):
+        if child_key in plan:
+            yield from _plan_stages(plan[child_key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+
+def check_index_usage():
+    """
+    Explain each query shape the API endpoints run and fail if any of them
+    falls back to a collection scan or a unique interview_id index is missing.
+    """
+    client = MongoClient(MONGODB_URL)
+    db = client[DATABASE_NAME]
+
+    sample_id = "explain-check"
+    endpoint_queries = [
+        ("next-question / submit-answer: interview lookup", "interviews", {"interview_id": sample_id}, None),
+        ("next-question: question set", "questions", {"interview_id": sample_id}, [("number", ASCENDING)]),
+        ("submit-answer: question lookup", "questions", {"interview_id": sample_id, "question_id": "q_1"}, None),
+        ("evaluation / evaluation exists", "evaluations", {"interview_id": sample_id}, None),
+    ]
+
+    all_indexed = True
+    for label, collection_name, query, sort in endpoint_queries:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        plan = cursor.explain()["queryPlanner"]["winningPlan"]
+        stages = set(_plan_stages(plan))
+        if "COLLSCAN" in stages:
+            all_indexed = False
+            print(f"✗ {label}: COLLSCAN on {collection_name}")
+        else:
+            print(f"✓ {label}: {', '.join(sorted(s for s in stages if s))}")
+
+    # One report and one document per interview rely on these being unique
+    for collection_name in ("interviews", "evaluations"):
+        index = db[collection_name].index_information().get("interview_id_unique")
+        if index and index.get("unique"):
+            print(f"✓ {collection_name}.interview_id_unique is unique")
+        else:
+            all_indexed = False
+            print(f"✗ {collection_name}.interview_id_unique is missing or not unique")
+
+    client.close()
+    return all_indexed
+
+
 if __name__ == "__main__":
+    if "--check-indexes" in sys.argv:
+        sys.exit(0 if check_index_usage() else 1)
     setup_database()